@@ -0,0 +1,3 @@
+from Benchmarks.run_benchmarks import main
+
+raise SystemExit(main())
@@ -0,0 +1,240 @@
+import argparse
+import glob
+import json
+import os
+import platform
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Any
+
+from mpl.Parser.ExpressionParsers.machine_expression_parser import MachineFile
+from mpl.Parser.ExpressionParsers.reference_expression_parser import Reference
+from mpl.interpreter.conflict_resolution import identify_conflicts
+from mpl.interpreter.reference_resolution.mpl_ontology import process_machine_file
+from mpl.interpreter.rule_evaluation import RuleInterpretationState
+from mpl.interpreter.rule_evaluation.mpl_engine import MPLEngine
+
+from Benchmarks.synthetic_machines import SyntheticMachine
+
+"""
+Times the main stages of the engine on the sample machines and on synthetic machines of growing size.  Every stage is
+timed `repeat` times and the best time is kept:
+
+MachineFile.parse       parsing the text of the machine
+process_machine_file    building the context and the graph of the parsed machine
+MPLEngine.from_file     building an engine from the parsed machine
+tick                    the time of one tick, over a run of `ticks` ticks
+execute_expression      executing one of the rules of the machine, on average
+identify_conflicts      finding the conflicts between the interpretations of every rule
+
+The results are written as json, and compared to a baseline, any stage that got slower than the baseline by more than
+the tolerance is reported as a regression
+
+    python -m Benchmarks --output results.json
+    python -m Benchmarks --save-baseline
+"""
+
+repository_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sample_patterns = ('Docs/Samples/*.mpl', 'Tests/test_files/*.mpl')
+default_baseline = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+timed_stages = (
+    'MachineFile.parse',
+    'process_machine_file',
+    'MPLEngine.from_file',
+    'tick',
+    'execute_expression',
+    'identify_conflicts',
+)
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    name: str
+    text: str
+    initial: Tuple[str, ...] = field(default_factory=tuple)
+
+
+@dataclass(frozen=True)
+class Regression:
+    case: str
+    stage: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+    def __str__(self):
+        return f'{self.case} {self.stage}: {self.baseline * 1000:.3f}ms -> {self.current * 1000:.3f}ms ' \
+               f'({self.ratio:.2f}x)'
+
+
+def sample_cases(patterns: Sequence[str] = sample_patterns) -> List[BenchmarkCase]:
+    result = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(os.path.join(repository_root, pattern))):
+            with open(path, 'r') as f:
+                result.append(BenchmarkCase(os.path.relpath(path, repository_root), f.read()))
+    return result
+
+
+def synthetic_cases(machines: Sequence[SyntheticMachine]) -> List[BenchmarkCase]:
+    result = []
+    for machine in machines:
+        generated = machine.generate()
+        result.append(BenchmarkCase(machine.name, generated.text, generated.initial))
+    return result
+
+
+def best_time(function: Callable[[], Any], repeat: int) -> float:
+    result = None
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        elapsed = perf_counter() - start
+        result = elapsed if result is None else min(result, elapsed)
+    return result
+
+
+def prepare_engine(case: BenchmarkCase) -> MPLEngine:
+    engine = MPLEngine.from_file(MachineFile.parse(case.text))
+    for name in case.initial:
+        engine.activate(Reference(name))
+    return engine
+
+
+def benchmark_case(case: BenchmarkCase, repeat: int = 3, ticks: int = 20, expressions: int = 50) -> Dict[str, Any]:
+    machine_file = MachineFile.parse(case.text)
+    engine = prepare_engine(case)
+    rules = sorted(engine.rule_interpreters, key=lambda x: str(x.expression))[:expressions]
+
+    result = {
+        'rules': len(engine.rule_interpreters),
+        'MachineFile.parse': best_time(lambda: MachineFile.parse(case.text), repeat),
+        'process_machine_file': best_time(lambda: process_machine_file(machine_file), repeat),
+        'MPLEngine.from_file': best_time(lambda: MPLEngine.from_file(machine_file), repeat),
+    }
+
+    if ticks:
+        run_time = best_time(lambda: engine.fork(0).run(ticks), repeat)
+        result['tick'] = run_time / ticks
+        result['ticks_per_second'] = ticks / run_time if run_time else None
+
+    if rules:
+        def execute_rules():
+            trial = engine.fork(0)
+            for rule in rules:
+                trial.execute_expression(rule.expression)
+
+        result['execute_expression'] = best_time(execute_rules, repeat) / len(rules)
+
+    interpretations = frozenset(
+        x for x in (rule.interpret(engine.context) for rule in engine.rule_interpreters)
+        if x.state != RuleInterpretationState.NOT_APPLICABLE
+    )
+    result['interpretations'] = len(interpretations)
+    result['identify_conflicts'] = best_time(lambda: identify_conflicts(interpretations), repeat)
+    return result
+
+
+def run_benchmarks(cases: Sequence[BenchmarkCase], repeat: int = 3, ticks: int = 20,
+                   report: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    results = {}
+    for case in cases:
+        try:
+            results[case.name] = benchmark_case(case, repeat, ticks)
+        except Exception as e:
+            # some of the samples use syntax the parser doesn't support yet
+            results[case.name] = {'error': f'{type(e).__name__}: {e}'.splitlines()[0]}
+        if report:
+            report(format_case(case.name, results[case.name]))
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cases': results,
+    }
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25,
+                        noise: float = 0.0005) -> List[Regression]:
+    """
+    the stages that took longer than the baseline by more than `tolerance` of its time, differences below `noise`
+    seconds are ignored
+    """
+    regressions = []
+    for case, stages in results['cases'].items():
+        baseline_stages = baseline.get('cases', {}).get(case, {})
+        for stage in timed_stages:
+            current = stages.get(stage)
+            previous = baseline_stages.get(stage)
+            if current is None or not previous:
+                continue
+            if current > previous * (1 + tolerance) and current - previous > noise:
+                regressions.append(Regression(case, stage, previous, current))
+    return regressions
+
+
+def format_case(name: str, stages: Dict[str, Any]) -> str:
+    if 'error' in stages:
+        return f'{name}: {stages["error"]}'
+    timings = ', '.join(f'{stage} {stages[stage] * 1000:.3f}ms' for stage in timed_stages if stage in stages)
+    rate = stages.get('ticks_per_second')
+    rate_text = f', {rate:.1f} ticks/s' if rate else ''
+    return f'{name} ({stages["rules"]} rules): {timings}{rate_text}'
+
+
+def parse_arguments(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m Benchmarks', description='times the stages of the MPL engine')
+    parser.add_argument('--repeat', type=int, default=3, help='times to run each stage, the best time is kept')
+    parser.add_argument('--ticks', type=int, default=20, help='ticks to run when timing ticks')
+    parser.add_argument('--states', type=int, nargs='*', default=[10, 40, 160],
+                        help='sizes of the synthetic machines, in states')
+    parser.add_argument('--depth', type=int, default=2, help='nesting depth of the synthetic machines')
+    parser.add_argument('--rules-per-state', type=float, default=2.0)
+    parser.add_argument('--trigger-density', type=float, default=0.2,
+                        help='share of the synthetic rules that go through a trigger')
+    parser.add_argument('--no-samples', action='store_true', help='only run the synthetic machines')
+    parser.add_argument('--output', help='where to write the results as json')
+    parser.add_argument('--baseline', default=default_baseline, help='results to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='replace the baseline with these results')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='how much slower than the baseline a stage may get, as a fraction')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    arguments = parse_arguments(argv)
+    machines = [
+        SyntheticMachine(states, arguments.depth, int(states * arguments.rules_per_state), arguments.trigger_density)
+        for states in arguments.states
+    ]
+    cases = ([] if arguments.no_samples else sample_cases()) + synthetic_cases(machines)
+    results = run_benchmarks(cases, arguments.repeat, arguments.ticks, print)
+
+    if arguments.output:
+        write_results(results, arguments.output)
+
+    if arguments.save_baseline:
+        write_results(results, arguments.baseline)
+        print(f'saved baseline to {arguments.baseline}')
+        return 0
+
+    if not os.path.exists(arguments.baseline):
+        print(f'no baseline at {arguments.baseline}, save one with --save-baseline')
+        return 0
+
+    with open(arguments.baseline, 'r') as f:
+        baseline = json.load(f)
+    regressions = compare_to_baseline(results, baseline, arguments.tolerance)
+    for regression in regressions:
+        print(f'regression: {regression}')
+    if not regressions:
+        print('no regressions')
+    return 1 if regressions else 0
+
+
+def write_results(results: Dict[str, Any], path: str):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
@@ -0,0 +1,76 @@
+from dataclasses import dataclass, field
+from random import Random
+from typing import List, Tuple
+
+"""
+Generates machine files of a chosen size, so we can see how the cost of each stage grows.  The machines are nested
+`depth` levels deep, every machine has `branching` sub machines, and the states are spread over the innermost ones.
+Rules move between random states, a share of them (`trigger_density`) fire a trigger that another rule observes
+"""
+
+
+@dataclass(frozen=True)
+class SyntheticMachine:
+    states: int = 20
+    depth: int = 2
+    rules: int = 40
+    trigger_density: float = 0.2
+    branching: int = 2
+    seed: int = 0
+
+    @property
+    def name(self) -> str:
+        return f'synthetic-s{self.states}-d{self.depth}-r{self.rules}-t{self.trigger_density:g}'
+
+    def generate(self) -> 'GeneratedMachine':
+        return generate_machine(self)
+
+
+@dataclass(frozen=True)
+class GeneratedMachine:
+    text: str
+    initial: Tuple[str, ...] = field(default_factory=tuple)
+
+
+def machine_paths(depth: int, branching: int) -> List[Tuple[str, ...]]:
+    paths = [('Root',)]
+    for level in range(depth):
+        paths = [path + (f'M{level}x{x}',) for path in paths for x in range(branching)]
+    return paths
+
+
+def generate_machine(spec: SyntheticMachine) -> GeneratedMachine:
+    rng = Random(spec.seed)
+    leaves = machine_paths(spec.depth, spec.branching)
+    states = [leaves[x % len(leaves)] + (f'S{x}',) for x in range(spec.states)]
+
+    lines = []
+    declared = set()
+    for state in sorted(states, key=lambda x: leaves.index(x[:-1])):
+        for level in range(1, len(state)):
+            path = state[:level]
+            if path in declared:
+                continue
+            declared.add(path)
+            lines.append(f'{"    " * (level - 1)}{path[-1]}: machine')
+        lines.append(f'{"    " * (len(state) - 1)}{state[-1]}: state')
+
+    def name(state: Tuple[str, ...]) -> str:
+        return '.'.join(state[1:])
+
+    triggers = 0
+    for _ in range(spec.rules):
+        source, target = rng.sample(states, 2)
+        if rng.random() < spec.trigger_density:
+            trigger = f'<T{triggers}>'
+            triggers += 1
+            observer, observed = rng.sample(states, 2)
+            lines.append(f'    {name(source)} ~> {trigger}')
+            lines.append(f'    {trigger} ~> {name(observer)} -> {name(observed)}')
+        else:
+            operator = rng.choice(['->', '~>'])
+            lines.append(f'    {name(source)} {operator} {name(target)}')
+
+    # rules are qualified with the root machine once they are loaded
+    initial = tuple('.'.join(x) for x in rng.sample(states, max(1, spec.states // 10)))
+    return GeneratedMachine('\n'.join(lines) + '\n', initial)
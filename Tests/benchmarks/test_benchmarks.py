@@ -0,0 +1,29 @@
+from Benchmarks.run_benchmarks import BenchmarkCase, benchmark_case, compare_to_baseline, timed_stages, \
+    prepare_engine, Regression
+from Benchmarks.synthetic_machines import SyntheticMachine
+from mpl.Parser.ExpressionParsers.reference_expression_parser import Ref
+
+
+def test_synthetic_machines_load_and_run():
+    spec = SyntheticMachine(states=12, depth=2, rules=10, trigger_density=0.5)
+    generated = spec.generate()
+    assert generated == spec.generate()
+
+    engine = prepare_engine(BenchmarkCase(spec.name, generated.text, generated.initial))
+    triggered = generated.text.count('~> <T')
+    assert len(engine.rule_interpreters) == spec.rules + triggered
+    assert all(engine.query(Ref(x)) for x in generated.initial)
+
+
+def test_benchmark_case_times_every_stage():
+    generated = SyntheticMachine(states=6, depth=1, rules=6).generate()
+    result = benchmark_case(BenchmarkCase('small', generated.text, generated.initial), repeat=1, ticks=2)
+    assert set(timed_stages) <= set(result)
+
+    baseline = {'cases': {'small': {stage: result[stage] for stage in timed_stages}}}
+    assert compare_to_baseline({'cases': {'small': result}}, baseline) == []
+
+    slower = {'cases': {'small': result | {'tick': result['tick'] * 2 + 0.001}}}
+    assert compare_to_baseline(slower, baseline) == [
+        Regression('small', 'tick', result['tick'], result['tick'] * 2 + 0.001)
+    ]
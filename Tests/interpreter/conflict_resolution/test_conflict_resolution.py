@@ -8,7 +8,7 @@ from Tests.interpreter.expression_evaluation.test_context_tree_interpretation im
 from mpl.Parser.ExpressionParsers.reference_expression_parser import Reference
 from mpl.Parser.ExpressionParsers.rule_expression_parser import RuleExpression
 from mpl.interpreter.conflict_resolution import identify_conflicts, normalize_tracker, get_resolutions, \
-    resolve_conflict_map
+    resolve_conflict_map, construct_conflict_masks, estimate_resolutions
 from mpl.interpreter.expression_evaluation.engine_context import EngineContext
 
 from mpl.interpreter.rule_evaluation import create_rule_interpreter, RuleInterpretation, RuleInterpretationState
@@ -172,3 +172,45 @@ def test_conflict_resolution_doesnt_break():
             intersection = affected_keys & c.keys
             assert not intersection, f"conflict on keys: {intersection}"
             affected_keys |= c.keys
+
+
+def test_conflict_masks():
+    a, b, c = Reference('A'), Reference('B'), Reference('C')
+    applicable = RuleInterpretationState.APPLICABLE
+    interpretations = [
+        RuleInterpretation(applicable, {a: None, b: None}, 'A -> B', core_state_assertions={a: 'CONSUME', b: 'TARGET'}),
+        RuleInterpretation(applicable, {a: None, c: None}, 'A -> C', core_state_assertions={a: 'CONSUME', c: 'TARGET'}),
+        RuleInterpretation(applicable, {b: None}, 'B += 1'),
+        RuleInterpretation(applicable, {c: None}, 'C += 1'),
+    ]
+
+    actual = construct_conflict_masks(interpretations)
+    assert actual == [0b0110, 0b1001, 0b0001, 0b0010]
+
+    conflicts = identify_conflicts(frozenset(interpretations))
+    assert conflicts[interpretations[2]] == {interpretations[0]}
+
+
+def test_estimate_resolutions():
+    a = 'One -> Two'
+    b = 'Two & Three -> Four'
+    c = 'Four -> Five'
+    d = 'Six -> Seven'
+    e = 'One -> Three -> Five'
+
+    interpretations, tmp = get_interpretations([a, b, c, d, e], full_context)
+    conflicts = identify_conflicts(interpretations)
+
+    expected = normalize_tracker(get_resolutions(conflicts, 5000))
+    actual = estimate_resolutions(conflicts, 5000)
+
+    assert actual.keys() == expected.keys()
+    for k, v in diff_trackers(expected, actual).items():
+        assert abs(v) < 0.05, f"{k} -> {v}"
+
+    applicable = RuleInterpretationState.APPLICABLE
+    heavy = RuleInterpretation(applicable, {Reference('A'): None}, 'heavy', frozenset({3}))
+    light = RuleInterpretation(applicable, {Reference('A'): None}, 'light', frozenset({1}))
+    actual = estimate_resolutions({heavy: frozenset({light}), light: frozenset({heavy})}, 10000)
+    assert abs(actual[frozenset({heavy})] - 0.75) < 0.02
+    assert abs(actual[frozenset({light})] - 0.25) < 0.02
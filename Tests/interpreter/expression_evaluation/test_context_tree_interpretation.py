@@ -1,3 +1,4 @@
+import random
 from textwrap import dedent
 from typing import Dict, Tuple
 
@@ -245,6 +246,79 @@ def test_change_node():
         assert actual_dict == expected_dict
 
 
+def test_copied_trees_share_unchanged_branches():
+    input_dict = {
+        Reference("a.b.c"): "value",
+        Reference("a.b.d"): 1,
+        Reference("test.final"): 3,
+    }
+    original = ContextTree.from_dict(input_dict)
+    original_dict = tree_to_dict(original.root)
+
+    copied = original.__copy__()
+    copied.change(Reference("a.b.d"), ev_fv(13))
+    original.change(Reference("test.final"), ev_fv(4))
+
+    assert tree_to_dict(copied.root)[Reference("a.b.d")] == ev_fv(13)
+    assert tree_to_dict(copied.root)[Reference("test.final")] == ev_fv(3)
+    assert tree_to_dict(original.root)[Reference("a.b.d")] == original_dict[Reference("a.b.d")]
+    assert tree_to_dict(original.root)[Reference("test.final")] == ev_fv(4)
+
+    assert copied.root is not original.root
+    assert copied.root.children['a'] is not original.root.children['a']
+    assert copied.root.children['test'] is not original.root.children['test']
+    copied_c = copied.root.children['a'].children['a.b'].children['a.b.c']
+    assert copied_c is original.root.children['a'].children['a.b'].children['a.b.c']
+
+
+def test_cached_entities_follow_changes():
+    def uncached_entity(node):
+        result = node.value
+        for child in node.children.values():
+            result |= uncached_entity(child)
+        return result
+
+    def assert_entities_are_current(node):
+        assert node.entity.value == uncached_entity(node).value, node.ref
+        for child in node.children.values():
+            assert_entities_are_current(child)
+
+    refs = [Reference(x) for x in ('a', 'a.b', 'a.b.c', 'a.b.d', 'a.e', 'f', 'f.g', 'a.*', 'a.b.*', 'f.*')]
+    rng = random.Random(0)
+    trees = [ContextTree.from_dict({Reference('a.b.c'): 1, Reference('f.g'): 2})]
+    for _ in range(200):
+        tree = rng.choice(trees).__copy__()
+        tree.change(rng.choice(refs), ev_fv(rng.choice([0, 1, 2, 3])))
+        trees.append(tree)
+        for item in trees:
+            assert_entities_are_current(item.root)
+
+
+def test_tree_index_follows_new_references():
+    tree = ContextTree.from_dict({Reference("a.b", frozenset({'state'})): 1})
+
+    assert Reference("a.b") in tree
+    assert Reference("a.b", frozenset({'state'})) in tree
+    assert Reference("a.b", frozenset({'trigger'})) not in tree
+    assert Reference("a.b.*") in tree
+    assert Reference("a.c") not in tree
+    assert tree[Reference("a.b")] == ev_fv(1)
+
+    copied = tree.__copy__()
+    copied.change(Reference("a.c.d"), ev_fv(2))
+
+    assert Reference("a.c.d") in copied
+    assert copied[Reference("a.c")] == ev_fv(2)
+    assert copied[Reference("a")] == ev_fv(1, 2)
+    assert Reference("a.c.d") not in tree
+    assert tree[Reference("a.c")] == EntityValue()
+
+    assert tree.refs_of_type('state') == {Reference("a.b", frozenset({'state'}))}
+    copied.change(Reference("a.c.d", frozenset({'trigger'})), ev_fv(3), update_types=True)
+    assert copied.refs_of_type('trigger') == {Reference("a.c.d", frozenset({'trigger'}))}
+    assert tree.refs_of_type('trigger') == frozenset()
+
+
 def test_conflict_resolution_chain():
     def generate_conflict_dict(keys: set[str]) -> Dict[Reference, Tuple[EntityValue, EntityValue]]:
         return {key: (ev_fv(), EntityValue.from_value(1)) for key in keys}
@@ -13,7 +13,7 @@ from mpl.interpreter.expression_evaluation.interpreters.query_expression_interpr
 from mpl.interpreter.expression_evaluation.interpreters.scenario_expression_interpreter import ScenarioResult
 from mpl.interpreter.expression_evaluation.operators import query_operations_dict
 from mpl.interpreter.expression_evaluation.stack_management import postfix, symbolize_postfix, symbolize_expression, \
-    evaluate_symbolized_postfix_stack
+    evaluate_symbolized_postfix_stack, CompiledPostfixStack
 from mpl.interpreter.expression_evaluation.types import ChangeLedgerRef
 
 from mpl.lib import fs
@@ -138,6 +138,8 @@ def test_query_expression_chain_evaluation():
         symbolized = symbolize_expression(expr)
         actual = evaluate_symbolized_postfix_stack(symbolized, context)
         assert actual == expected, entry
+        compiled = CompiledPostfixStack(symbolized)(context)
+        assert compiled == expected, entry
 
 
 def test_query_expression_interpreter_complex():
@@ -4,7 +4,7 @@ from mpl.Parser.ExpressionParsers.query_expression_parser import QueryExpression
 from mpl.Parser.ExpressionParsers.reference_expression_parser import Ref
 from mpl.Parser.ExpressionParsers.scenario_expression_parser import ScenarioExpression
 from mpl.interpreter.expression_evaluation.interpreters.create_expression_interpreter import \
-    create_expression_interpreter
+    create_expression_interpreter, clear_expression_interpreter_cache, expression_interpreter_cache_info
 from mpl.lib import fs
 
 
@@ -73,3 +73,17 @@ def test_get_references_from_target():
         interpreter = create_expression_interpreter(expression, True)
         result = interpreter.references
         assert result == expected
+
+
+def test_expression_interpreters_are_cached():
+    clear_expression_interpreter_cache()
+    expression = quick_parse(QueryExpression, 'a & b')
+
+    first = create_expression_interpreter(expression)
+    second = create_expression_interpreter(quick_parse(QueryExpression, 'a & b'))
+    target = create_expression_interpreter(expression, True)
+
+    assert first is second
+    assert target is not first
+    info = expression_interpreter_cache_info()
+    assert (info.hits, info.misses) == (1, 2)
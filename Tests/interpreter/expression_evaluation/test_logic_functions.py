@@ -326,6 +326,22 @@ def test_logical_eq():
         assert actual == expectation
 
 
+def test_logical_eq_on_plain_numbers():
+    from sympy import Integer, Float, Rational
+
+    expectations = {
+        (ev_fv(1, 2.5), ev_fv(Integer(1), Float(2.5))): ev_fv(1, 2.5, Float(2.5)),
+        (ev_fv(1, 2), ev_fv(1, 3)): ev_fv(),
+        (ev_fv(True, Ref('ok')), ev_fv(1)): ev_fv(True, Ref('ok')),
+        (ev_fv(0.1), ev_fv(Rational(1, 10))): ev_fv(0.1, Rational(1, 10)),
+        (ev_fv(4) < ev_fv(Integer(5)), ev_fv(4)): ev_fv(4),
+    }
+
+    for (o, B), expectation in expectations.items():
+        actual = o == B
+        assert actual == expectation
+
+
 def test_logical_inequality_comparisons():
 
     bank = ev_fv(3 * Ref('red') + 5 * Ref('black'))
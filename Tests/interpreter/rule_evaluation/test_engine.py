@@ -1,4 +1,7 @@
-import random
+
+import os
+import subprocess
+import sys
 
 from Tests import quick_parse
 from mpl.Parser.ExpressionParsers.reference_expression_parser import Ref
@@ -41,10 +44,11 @@ def test_basic_operations():
     assert actual == ev_fv(1)
 
     trials = 100
-    tolerance = 0.075
+    # One -> Two and One -> Three -> Five compete for One, so each trial reaches Two with p = 0.5, checked to 3 sigma
+    tolerance = 3 * (trials * 0.5 * 0.5) ** 0.5
     hit_5 = 0
     hit_two = 0
-    random.seed(0)
+    engine.seed(0)
     for i in range(trials):
         diff = engine.activate(Ref('One'))
         diff = engine.activate(Ref('Three'))
@@ -67,7 +71,7 @@ def test_basic_operations():
 
     assert hit_5 == trials
     from sympy import Interval
-    acceptable_hit_two_range = Interval(trials/2 * (1-tolerance), trials/2 * (1+tolerance))
+    acceptable_hit_two_range = Interval(trials/2 - tolerance, trials/2 + tolerance)
 
     assert hit_two in acceptable_hit_two_range
 
@@ -84,4 +88,120 @@ def test_evaluate_rule_from_wumpus_file():
     tmp = engine.tick()
     assert not engine.query(Ref('Wumpus.Health.Hurt'))
     assert engine.query(Ref('Wumpus.Activity.Recover'))
-    assert engine.query(Ref('Wumpus.Health.Ok'))
\ No newline at end of file
+    assert engine.query(Ref('Wumpus.Health.Ok'))
+
+def test_tick_only_interprets_rules_touched_by_changes():
+    rules_text = ['One -> Two', 'Three -> Four', 'Five -> Six']
+    expressions = {quick_parse(RuleExpression, item) for item in rules_text}
+
+    engine = MPLEngine()
+    engine = engine.add(expressions)
+
+    assert len(engine.scheduler.due) == 3
+    engine.tick()
+    assert not engine.scheduler.due
+
+    engine.activate(Ref('One'))
+    assert {x.name for x in engine.scheduler.due} == {'One -> Two'}
+
+    engine.tick()
+    assert engine.query(Ref('Two'))
+    assert {x.name for x in engine.scheduler.due} == {'One -> Two'}
+
+    engine.tick()
+    assert not engine.scheduler.due
+
+
+def test_explore_reports_distribution_of_outcomes():
+    rules_text = ['One -> Two', 'One -> Three', 'Two -> Four']
+    expressions = {quick_parse(RuleExpression, item) for item in rules_text}
+
+    engine = MPLEngine()
+    engine = engine.add(expressions)
+    engine.activate(Ref('One'))
+
+    actual = engine.explore(40, 2, workers=1)
+    outcomes = {frozenset(ref.name for ref, _ in outcome) - {'ROOT'} for outcome in actual}
+    assert outcomes == {frozenset({'Three'}), frozenset({'Four'})}
+    assert abs(sum(actual.values()) - 1) < 1e-9
+
+    assert engine.explore(40, 2, workers=2).keys() == actual.keys()
+    assert engine.query(Ref('One'))
+    assert not engine.history
+
+
+def test_run_logs_changes_per_tick():
+    rules_text = ['One -> Two', 'Two -> Three', 'Three -> Four']
+    expressions = {quick_parse(RuleExpression, item) for item in rules_text}
+
+    engine = MPLEngine()
+    engine = engine.add(expressions)
+    engine.activate(Ref('One'))
+
+    log = engine.run(4, seed=0)
+
+    assert engine.query(Ref('Four'))
+    assert len(engine.history) == 4
+    assert sorted(set(log.ticks)) == [0, 1, 2]
+    assert log.at(1) == engine.history[2]
+    assert log.at(3) == {}
+    assert (1, Ref('Three'), ev_fv(), ev_fv(True)) in list(log)
+
+
+def test_profiler_times_each_tick():
+    rules_text = ['One -> Two', 'Two -> Three', 'Four -> Five']
+    expressions = {quick_parse(RuleExpression, item) for item in rules_text}
+
+    engine = MPLEngine()
+    engine = engine.add(expressions)
+    engine.activate(Ref('One'))
+
+    profiler = engine.start_profiling()
+    engine.tick(2)
+    assert engine.stop_profiling() is profiler
+    engine.tick()
+
+    summary = profiler.summary()
+    assert summary['ticks'] == 2
+    assert summary['applicable'] == 2
+    assert set(summary['phases']) == {
+        'interpret', 'identify_conflicts', 'resolve_conflict_map', 'get_invalidated_triggers', 'update'
+    }
+    assert summary['not_applicable'] == 3
+    # rules are only interpreted when the references they read have changed
+    assert summary['rules']['One -> Two']['calls'] == 2
+    assert summary['rules']['Four -> Five']['calls'] == 1
+
+    import json
+    assert json.loads(profiler.to_json())['ticks'] == 2
+
+
+seeded_run_script = """
+from Benchmarks.synthetic_machines import SyntheticMachine
+from mpl.Parser.ExpressionParsers.machine_expression_parser import MachineFile
+from mpl.Parser.ExpressionParsers.reference_expression_parser import Ref
+from mpl.interpreter.rule_evaluation.mpl_engine import MPLEngine
+
+machine = SyntheticMachine(states=20, depth=2, rules=40, trigger_density=0.4, seed=0).generate()
+engine = MPLEngine.from_file(MachineFile.parse(machine.text))
+for name in machine.initial:
+    engine.activate(Ref(name))
+engine.seed(0)
+for _ in range(30):
+    engine.tick()
+    print(','.join(sorted(ref.name for ref in engine.active)))
+"""
+
+
+def test_seeded_runs_dont_depend_on_hashing():
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    outputs = []
+    for hash_seed in ('1', '2', '3'):
+        env = os.environ | {'PYTHONHASHSEED': hash_seed, 'PYTHONPATH': root}
+        result = subprocess.run(
+            [sys.executable, '-c', seeded_run_script], cwd=root, env=env, capture_output=True, text=True, check=True
+        )
+        outputs.append(result.stdout)
+
+    assert outputs[0].count('\n') == 30
+    assert outputs[0] == outputs[1] == outputs[2]
@@ -0,0 +1,64 @@
+import pickle
+from copy import copy
+
+from Tests import quick_parse
+from mpl.Parser.ExpressionParsers.reference_expression_parser import Ref
+from mpl.Parser.ExpressionParsers.rule_expression_parser import RuleExpression
+from mpl.interpreter.rule_evaluation.engine_history import History
+from mpl.interpreter.rule_evaluation.mpl_engine import MPLEngine
+
+
+def test_history_retention_and_spill():
+    kept = History(limit=3)
+    spilled = History(limit=3, spill=True)
+    for i in range(10):
+        kept.push({'tick': i})
+        spilled.push({'tick': i})
+
+    assert len(kept) == 3
+    assert list(kept) == [{'tick': 9}, {'tick': 8}, {'tick': 7}]
+    assert len(spilled) == 10
+    assert spilled[0] == {'tick': 9}
+    assert spilled[8] == {'tick': 1}
+
+    other = copy(spilled)
+    other.push({'tick': 10})
+    assert [other.pop()['tick'] for _ in range(11)] == list(range(10, -1, -1))
+    assert len(spilled) == 10
+
+    restored = pickle.loads(pickle.dumps(spilled))
+    assert restored == spilled
+    assert restored == tuple({'tick': i} for i in range(9, -1, -1))
+
+
+def test_tick_backward_stops_at_the_start_of_history():
+    engine = MPLEngine(history=History(limit=2))
+    engine.add(quick_parse(RuleExpression, 'One -> Two'))
+    engine.add(quick_parse(RuleExpression, 'Two -> Three'))
+    engine.activate(Ref('One'))
+
+    engine.tick()
+    engine.tick()
+    engine.tick()
+    assert engine.query(Ref('Three'))
+    assert len(engine.history) == 2
+
+    # the first tick was dropped from the history, so it can't be undone
+    engine.tick(-5)
+    assert engine.query(Ref('Two'))
+    assert not engine.query(Ref('Three'))
+    assert not engine.history
+
+
+def test_forks_start_with_an_empty_history():
+    engine = MPLEngine(history=History(limit=5))
+    engine.add(quick_parse(RuleExpression, 'One -> Two'))
+    engine.activate(Ref('One'))
+    engine.tick()
+    assert len(engine.history) == 1
+
+    fork = engine.fork(0)
+    assert not fork.history
+    assert fork.history.limit == 5
+    assert fork.query(Ref('Two'))
+    assert len(copy(engine).history) == 1
@@ -0,0 +1,70 @@
+import os
+import random
+
+from Tests import quick_parse
+from mpl.Parser.ExpressionParsers.reference_expression_parser import Ref
+from mpl.Parser.ExpressionParsers.rule_expression_parser import RuleExpression
+from mpl.interpreter.rule_evaluation.engine_journal import list_checkpoints, journal_file_name
+from mpl.interpreter.rule_evaluation.mpl_engine import MPLEngine
+
+
+def test_recover_replays_journal(tmp_path):
+    engine = MPLEngine.from_file('Tests/test_files/simple_wumpus.mpl')
+    engine.start_journal(str(tmp_path), batch_size=4, checkpoint_interval=25)
+
+    random.seed(0)
+    names = sorted(x for x in engine.context if x.name != 'ROOT')
+    for i in range(40):
+        engine.activate(random.choice(names))
+        engine.tick(2)
+        if i % 10 == 0:
+            engine.add(quick_parse(RuleExpression, f'Extra {i} -> Other {i}'))
+    engine.tick(-1)
+    engine.journal.flush()
+
+    assert len(list_checkpoints(str(tmp_path))) == 1
+
+    recovered = MPLEngine.recover(str(tmp_path))
+    assert recovered.context == engine.context
+    assert recovered.history == engine.history
+    assert recovered.rule_interpreters == engine.rule_interpreters
+
+
+def test_recover_ignores_torn_records(tmp_path):
+    engine = MPLEngine()
+    engine.add(quick_parse(RuleExpression, 'One -> Two'))
+    engine.start_journal(str(tmp_path))
+    engine.activate(Ref('One'))
+    engine.journal.close()
+
+    with open(os.path.join(tmp_path, journal_file_name), 'ab') as f:
+        f.write(b'\x00\x00\x01\x00partial')
+
+    recovered = MPLEngine.recover(str(tmp_path))
+    assert recovered.query(Ref('One'))
+    recovered.tick()
+    recovered.journal.close()
+
+    assert MPLEngine.recover(str(tmp_path)).query(Ref('Two'))
+
+
+def test_recover_after_cli_changes(tmp_path):
+    from mpl.runtime.cli.mplsh import execute_command
+
+    engine = MPLEngine()
+    engine.start_journal(str(tmp_path))
+    execute_command(engine, 'load rules from Tests/test_files/simplest.mpl')
+    execute_command(engine, 'load context from Tests/test_files/simplest.mpl')
+    execute_command(engine, 'Alpha -> Beta')
+    execute_command(engine, '+Gamma')
+    engine.tick(2)
+    engine.journal.flush()
+
+    recovered = MPLEngine.recover(str(tmp_path))
+    assert recovered.context == engine.context
+    assert recovered.rule_interpreters == engine.rule_interpreters
+    assert recovered.query(Ref('Gamma'))
+
+    cleared = execute_command(engine, 'clear context')
+    cleared.journal.flush()
+    assert MPLEngine.recover(str(tmp_path)).context == cleared.context
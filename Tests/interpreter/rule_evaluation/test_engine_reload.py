@@ -0,0 +1,49 @@
+import pytest
+
+from mpl.Parser.ExpressionParsers.machine_expression_parser import MachineFile
+from mpl.Parser.ExpressionParsers.reference_expression_parser import Ref
+from mpl.interpreter.reference_resolution.mpl_ontology import rule_expressions_from_graph
+from mpl.interpreter.rule_evaluation.engine_reload import MachineFileLoader, load_reloadable
+from mpl.interpreter.rule_evaluation.mpl_engine import MPLEngine
+
+
+def test_loader_only_parses_changed_lines():
+    with open('Tests/test_files/simple_wumpus.mpl', 'r') as f:
+        text = f.read()
+    loader = MachineFileLoader.from_text(text)
+    assert list(loader.machine_file.lines) == list(MachineFile.parse(text).lines)
+    assert loader.machine_file.context == MachineFile.parse(text).context
+
+    lines = text.split('\n')
+    lines.insert(3, '        Wumpus.Health.Hurt -> Wumpus.Health.Ok')
+    edited = '\n'.join(lines)
+    result = loader.update(edited)
+
+    assert result.parsed == 1
+    assert list(loader.machine_file.lines) == list(MachineFile.parse(edited).lines)
+    assert len(result.added) == 1 and not result.removed
+
+    with pytest.raises(ValueError):
+        loader.update(edited.replace('Wumpus.Health.Hurt -> Wumpus.Health.Ok', '-> ->'))
+    assert loader.update(edited).parsed == 0
+
+
+def test_reload_keeps_context(tmp_path):
+    path = tmp_path / 'machine.mpl'
+    path.write_text('Machine: machine\n    One: state\n    Two: state\n    One -> Two\n')
+    engine = load_reloadable(str(path))
+    engine.activate(Ref('Machine.One'))
+
+    path.write_text('Machine: machine\n    One: state\n    Two: state\n    Three: state\n    One -> Three\n')
+    result = engine.reload(str(path))
+
+    assert result.parsed == 2
+    expected = MPLEngine.from_file(MachineFile.from_file(str(path)))
+    assert rule_expressions_from_graph(engine.ontology) == rule_expressions_from_graph(expected.ontology)
+    assert {x.expression for x in engine.rule_interpreters} == {x.expression for x in expected.rule_interpreters}
+    assert engine.query(Ref('Machine.One'))
+    assert 'state' in engine.get_types(Ref('Machine.Three'))
+
+    engine.tick()
+    assert engine.query(Ref('Machine.Three'))
+    assert not engine.query(Ref('Machine.One'))
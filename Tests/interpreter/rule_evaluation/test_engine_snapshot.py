@@ -0,0 +1,65 @@
+import pickle
+import zlib
+
+import pytest
+
+from mpl.Parser.ExpressionParsers.reference_expression_parser import Ref
+from mpl.interpreter.rule_evaluation.engine_snapshot import dump_engine, load_engine, SnapshotError
+from mpl.interpreter.rule_evaluation.mpl_engine import MPLEngine
+from mpl.runtime.cli.mplsh import execute_command
+
+
+def test_snapshot_round_trip():
+    engine = MPLEngine.from_file('Tests/test_files/simple_wumpus.mpl')
+    engine.activate(Ref('Wumpus.Health.Hurt'))
+    engine.activate(Ref('Wumpus.Activity.Recover'))
+    engine.tick()
+
+    loaded = load_engine(dump_engine(engine))
+
+    assert loaded.rule_interpreters == engine.rule_interpreters
+    assert loaded.context == engine.context
+    assert loaded.history == engine.history
+    assert set(loaded.graph.edges(data='relationship')) == set(engine.graph.edges(data='relationship'))
+    assert loaded.get_types(Ref('Wumpus')) == engine.get_types(Ref('Wumpus'))
+
+
+def test_snapshot_rejects_other_content():
+    data = dump_engine(MPLEngine())
+
+    with pytest.raises(SnapshotError):
+        load_engine(b'not a snapshot')
+    with pytest.raises(SnapshotError):
+        load_engine(data[:4] + b'\xff\xff' + data[6:])
+
+
+def test_snapshot_rejects_corrupt_payloads(tmp_path):
+    data = dump_engine(MPLEngine.from_file('Tests/test_files/flashlight.mpl'))
+    path = tmp_path / 'truncated.mpls'
+    path.write_bytes(data[:len(data) // 2])
+
+    with pytest.raises(SnapshotError):
+        MPLEngine.from_snapshot(str(path))
+    with pytest.raises(SnapshotError):
+        load_engine(data[:6] + b'garbage')
+    with pytest.raises(SnapshotError):
+        load_engine(data[:6] + zlib.compress(b'not a pickle'))
+
+    pickled = zlib.decompress(data[6:])
+    with pytest.raises(SnapshotError):
+        load_engine(data[:6] + zlib.compress(pickled[:len(pickled) // 2]))
+    with pytest.raises(SnapshotError):
+        load_engine(data[:6] + zlib.compress(pickle.dumps(['rules', 'graph'])))
+    with pytest.raises(SnapshotError):
+        load_engine(data[:6] + zlib.compress(pickle.dumps({'rules': ()})))
+
+
+def test_binary_save_and_load_commands(tmp_path):
+    path = tmp_path / 'flashlight.mpls'
+    engine = MPLEngine()
+    execute_command(engine, 'load Tests/test_files/flashlight.mpl')
+    execute_command(engine, f'save binary to {path}')
+
+    loaded = execute_command(MPLEngine(), f'load binary from {path}')
+    assert loaded.rule_interpreters == engine.rule_interpreters
+    assert loaded.context == engine.context
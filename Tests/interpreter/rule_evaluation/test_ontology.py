@@ -6,7 +6,7 @@ from mpl.Parser.ExpressionParsers.machine_expression_parser import MachineFile
 from mpl.Parser.ExpressionParsers.reference_expression_parser import Ref
 
 from mpl.interpreter.reference_resolution.mpl_ontology import process_machine_file, get_current_path, PathInfo, \
-    get_edges_by_type, Relationship, engine_to_string
+    get_edges_by_type, Relationship, engine_to_string, OntologyIndex, get_entity_tree_from_graph
 from mpl.interpreter.expression_evaluation.entity_value import EntityValue, ev_fv
 
 """
@@ -160,3 +160,45 @@ def test_engine_to_string():
         new_graph = set(new_engine.graph.edges(data='relationship'))
         unaccounted_for_edges = original_graph-new_graph
         assert not unaccounted_for_edges
+
+
+def test_ontology_index_follows_engine_graph():
+    from copy import copy
+    from Tests import quick_parse
+    from mpl.Parser.ExpressionParsers.rule_expression_parser import RuleExpression
+    from mpl.interpreter.rule_evaluation.mpl_engine import MPLEngine
+
+    engine = MPLEngine.from_file('Tests/test_files/simple_wumpus.mpl')
+    assert engine.get_types(Ref('Wumpus')) == {'machine'}
+    assert engine.get_types(Ref('Not In The Graph')) == frozenset()
+
+    original = copy(engine)
+    rule = quick_parse(RuleExpression, 'Alpha -> Beta')
+    engine.add(rule)
+    assert engine.ontology.sources(Ref('Alpha'), Relationship.USES) == (rule,)
+    assert not original.ontology.sources(Ref('Alpha'), Relationship.USES)
+
+    engine.remove(rule)
+    assert Ref('Alpha') not in engine.graph
+    assert not engine.ontology.sources(Ref('Alpha'), Relationship.USES)
+    assert engine.ontology.nodes == set(engine.graph.nodes)
+    assert set(original.graph.edges(data='relationship')) == set(engine.graph.edges(data='relationship'))
+    assert engine.rule_interpreters == original.rule_interpreters
+
+
+def test_entity_tree_keeps_the_order_of_the_graph():
+    from copy import copy
+    graph = nx.MultiDiGraph()
+    for name in ('Zeta', 'Alpha', 'Mu'):
+        graph.add_edge(Ref(name), 'machine', relationship=Relationship.IS_A)
+    graph.add_edge(Ref('Mu'), 'engine root', relationship=Relationship.USES)
+    graph.add_edge(Ref('Zeta'), 'engine root', relationship=Relationship.DEFINED_IN)
+    graph.add_edge(Ref('Alpha'), 'engine root', relationship=Relationship.DEFINED_IN)
+    graph.add_edge(Ref('Mu'), 'engine root', relationship=Relationship.DEFINED_IN)
+
+    index = OntologyIndex.from_graph(graph)
+    assert [ref.path[-1] for ref, _ in get_entity_tree_from_graph(index)] == ['Mu', 'Zeta', 'Alpha']
+
+    index.remove_nodes([Ref('Zeta')])
+    index.add_edge(Ref('Zeta'), 'engine root', Relationship.DEFINED_IN)
+    assert [ref.path[-1] for ref, _ in get_entity_tree_from_graph(copy(index))] == ['Mu', 'Alpha', 'Zeta']
@@ -1,7 +1,8 @@
 import pytest
 
 from mpl.lib import fs
-from mpl.lib.relational_math import red, ineq_resolver, simplify_relational_set, black
+from mpl.lib.relational_math import red, ineq_resolver, simplify_relational_set, black, relational_cache_info, \
+    clear_relational_cache
 
 
 def test_reduction_of_multiple_univariate_inequalities():
@@ -31,6 +32,20 @@ def test_complicated_reduction_of_multiple_enqualities():
         assert actual == expected
 
 
+def test_relational_reductions_are_cached():
+    clear_relational_cache()
+    ineq = fs(red < 13, red < 9, red > 3)
+
+    first = simplify_relational_set(ineq)
+    second = simplify_relational_set(set(ineq))
+
+    assert first == second == fs(red < 9, red > 3)
+    info = relational_cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    assert simplify_relational_set(fs()) == fs()
+    assert relational_cache_info().misses == 1
+
+
 @pytest.mark.skip(reason="TODO: fix this test")
 def test_simple_reduction_of_bivariate_inequalities():
     # TODO:  This needs a bunch of work, see https://www.dcsc.tudelft.nl/~bdeschutter/pub/rep/93_71.pdf
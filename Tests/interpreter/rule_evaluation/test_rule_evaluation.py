@@ -169,3 +169,30 @@ def test_evaluate_rule():
         actual = interpreter.interpret(context)
         assert actual == expected, rule
 
+
+
+def test_interpretation_precomputes_derived_values():
+    a, b = Reference('a'), Reference('b')
+    interpretation = RuleInterpretation(
+        RuleInterpretationState.APPLICABLE,
+        {a: quick_change(1, 0), b: quick_change(0, 1)},
+        source='a -> b',
+        scenarios=fs(2, 3),
+        core_state_assertions={a: 'CONSUME', b: ev_fv(1)},
+    )
+
+    assert interpretation.keys == {a, b}
+    assert interpretation.requirements == {a: 'CONSUME', b: ev_fv(1)}
+    assert interpretation.strong_keys == {a}
+    assert interpretation.scenario_weight == 5
+    assert not hasattr(interpretation, '__dict__')
+
+    same = RuleInterpretation(
+        RuleInterpretationState.APPLICABLE,
+        {b: quick_change(0, 1), a: quick_change(1, 0)},
+        source='a -> b',
+        scenarios=fs(3, 2),
+        core_state_assertions={b: ev_fv(1), a: 'CONSUME'},
+    )
+    assert same == interpretation
+    assert hash(same) == hash(interpretation)
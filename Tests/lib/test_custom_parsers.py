@@ -1,6 +1,6 @@
 from typing import Dict, Any
 
-from parsita import Success, lit, Failure, Parser, TextParsers, reg, repsep
+from parsita import Success, lit, Failure, Parser, TextParsers, reg, repsep, longest
 from parsita.parsers import RegexParser
 from parsita.state import Input, Output
 
@@ -8,6 +8,8 @@ from Tests import collect_parsing_expectations
 from mpl.lib.parsers.custom_parsers import excluding, check, debug, back
 from mpl.lib.parsers.additive_parsers import track, TrackedValue, TrackingMetadata
 from mpl.lib.parsers.repsep2 import repsep2, SeparatedList
+from mpl.lib.parsers import packrat as packrat_module
+from mpl.lib.parsers.packrat import memo, packrat
 
 
 def test_exclude_parser():
@@ -202,3 +204,37 @@ def test_lookback():
     for result in collect_parsing_expectations(expectations, test_parser):
         assert result.actual == result.expected
 
+
+
+def test_memo_parser():
+    calls = []
+
+    def count(value):
+        calls.append(value)
+        return value
+
+    word = memo(reg(r'\w+') > count)
+    parser = longest(word << '!', word << '?', word)
+
+    assert parser.parse('hello') == Success('hello')
+    assert len(calls) == 3
+
+    calls.clear()
+    with packrat():
+        assert parser.parse('hello') == Success('hello')
+        assert isinstance(parser.parse('hello.'), Failure)
+    assert calls == ['hello', 'hello']
+    assert packrat_module.active_memo is None
+
+
+def test_packrat_machine_file_parse():
+    from mpl.Parser.ExpressionParsers.machine_expression_parser import MachineFile, MachineDefinitionExpressionParsers
+
+    with open('Tests/test_files/simple_wumpus.mpl') as f:
+        text = f.read()
+
+    expected = MachineDefinitionExpressionParsers.machine_file.parse(text).unwrap()
+    actual = MachineFile.parse(text)
+    assert actual == expected
+    actual_metadata = [getattr(x, 'metadata', None) for x in actual.lines]
+    assert actual_metadata == [getattr(x, 'metadata', None) for x in expected.lines]
@@ -1,5 +1,5 @@
 from Tests import quick_parse
-from mpl.Parser.ExpressionParsers.machine_expression_parser import MachineFile
+from mpl.Parser.ExpressionParsers.machine_expression_parser import MachineFile, split_blocks
 from mpl.Parser.ExpressionParsers.reference_expression_parser import ReferenceExpression
 
 
@@ -25,3 +25,20 @@ def test_parsing_with_context():
     }
 
     assert actual.context == expected_context
+
+
+def test_parallel_parsing_matches_serial_parsing():
+    for path in ('Tests/test_files/simple_wumpus.mpl', 'Tests/test_files/simplest.mpl'):
+        expected = MachineFile.from_file(path)
+        actual = MachineFile.from_file(path, parallel=True, workers=2)
+
+        assert actual == expected
+        assert actual.lines.separators == expected.lines.separators
+        assert [x.metadata for x in actual.lines if hasattr(x, 'metadata')] == \
+               [x.metadata for x in expected.lines if hasattr(x, 'metadata')]
+
+
+def test_split_blocks():
+    lines = ['    a -> b', 'One: machine', '    Two: state', '', 'Three: state']
+
+    assert split_blocks(lines) == [(0, lines[0:1]), (1, lines[1:4]), (4, lines[4:])]
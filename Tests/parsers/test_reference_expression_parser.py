@@ -1,7 +1,7 @@
 from parsita import Success
 
 from mpl.Parser.ExpressionParsers.reference_expression_parser import ReferenceExpressionParsers, ReferenceExpression, \
-    Reference
+    Reference, interned_references
 from mpl.lib import fs
 
 
@@ -47,3 +47,37 @@ def test_reference_expression_parsing():
         expression = result.value
         actual = expression.reference
         assert actual == expected, input
+
+
+def test_references_are_interned():
+    import pickle
+
+    ref = Reference('base.test me', fs('state'))
+
+    assert ref is Reference('base.test me', fs('state'))
+    assert ref is not Reference('base.test me')
+    assert ref != Reference('base.test me')
+    assert ref.without_types is Reference('base.test me')
+    assert ref.with_types('state') is ref
+    assert ref.parent is Reference('base', fs('state'))
+    assert ref.void is Reference('base.test me.*', fs('state'))
+    assert ref.parent is ref.parent
+    assert ref.symbol is ref.symbol
+    assert ref.expression.path == ('base', 'test me')
+    assert pickle.loads(pickle.dumps(ref)) is ref
+
+
+def test_unused_references_leave_the_intern_table():
+    import gc
+
+    ref = Reference('unused.reference', fs('state'))
+    assert ref.parent and ref.void and ref.expression and ref.symbol
+    key = ('unused.reference', fs('state'))
+    assert interned_references[key] is ref
+
+    del ref
+    gc.collect()
+
+    assert key not in interned_references
+    assert ('unused.reference.*', fs('state')) not in interned_references
+    assert Reference('unused.reference', fs('state')) == Reference('unused.reference', fs('state'))
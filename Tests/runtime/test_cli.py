@@ -12,7 +12,7 @@ from mpl.interpreter.expression_evaluation.entity_value import ev_fv
 from mpl.interpreter.rule_evaluation.mpl_engine import MPLEngine
 from mpl.lib import fs
 from mpl.runtime.cli.command_parser import SystemCommand, QueryCommand, ExploreCommand, ActivateCommand, TickCommand, \
-    CommandParsers, LoadCommand, MemoryType, SaveCommand
+    CommandParsers, LoadCommand, MemoryType, SaveCommand, StatsCommand, StatsAction
 from mpl.runtime.cli.mplsh import execute_command
 
 
@@ -27,6 +27,11 @@ def test_command_parsing():
         '?': QueryCommand(),
         'explore 13': ExploreCommand(13),
         'explore': ExploreCommand(1),
+        'explore 13 4': ExploreCommand(13, 4),
+        'stats': StatsCommand(),
+        'stats on': StatsCommand(StatsAction.START),
+        'stats off': StatsCommand(StatsAction.STOP),
+        'stats to /tmp/stats.json': StatsCommand(StatsAction.SAVE, '/tmp/stats.json'),
         '+a': ActivateCommand(quick_parse(AssignmentExpression, f"a=True")),
         '.': TickCommand(1),
         '.1': TickCommand(1),
@@ -123,6 +128,8 @@ def test_basic_command_parsing():
         'load context from /foo/bar': LoadCommand('/foo/bar', MemoryType.CONTEXT),
         'load rules from foo/bar': LoadCommand('foo/bar', MemoryType.RULES),
         'save scratch.mpl': SaveCommand('scratch.mpl', MemoryType.ALL),
+        'save binary to scratch.mpls': SaveCommand('scratch.mpls', MemoryType.ALL, True),
+        'load binary from /foo/bar.mpls': LoadCommand('/foo/bar.mpls', MemoryType.ALL, True),
     }
 
     for input, expected in expectations.items():
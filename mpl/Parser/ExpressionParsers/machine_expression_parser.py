@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import List, Dict, Optional, FrozenSet
+from math import ceil
+from typing import List, Dict, Optional, FrozenSet, Tuple, Any, Sequence
 
-from parsita import TextParsers, reg, longest, Success, lit, opt, rep
+from parsita import TextParsers, reg, longest, Success, lit, opt, rep, StringReader
+from parsita.state import Continue
 from parsita.util import splat
 
 from mpl.Parser.ExpressionParsers.reference_expression_parser import ReferenceExpression, \
@@ -14,6 +18,7 @@ from mpl.Parser.ExpressionParsers.query_expression_parser import VectorExpressio
 from mpl.lib.parsers.additive_parsers import track, TrackedValue
 from mpl.lib.parsers.custom_parsers import check, debug
 from mpl.lib.parsers.repsep2 import repsep2, SeparatedList
+from mpl.lib.parsers.packrat import packrat
 
 
 @dataclass(frozen=True, order=True)
@@ -31,16 +36,23 @@ class MachineFile:
     context: Optional[Dict[ReferenceExpression, FrozenSet]] = None
 
     @staticmethod
-    def parse(text: str) -> MachineFile:
-        result = MachineDefinitionExpressionParsers.machine_file.parse(text)
+    def parse(text: str, parallel: bool = False, workers: Optional[int] = None) -> MachineFile:
+        """
+        parses a machine file, in parallel mode the top level blocks of the file are parsed on a pool of `workers`
+        processes, see `parse_in_parallel`
+        """
+        if parallel:
+            return parse_in_parallel(text, workers)
+        with packrat():
+            result = MachineDefinitionExpressionParsers.machine_file.parse(text)
         assert isinstance(result, Success)
         return result.value
 
     @staticmethod
-    def from_file(path: str) -> MachineFile:
+    def from_file(path: str, parallel: bool = False, workers: Optional[int] = None) -> MachineFile:
         with open(path, 'r') as f:
             content = f.read()
-            return MachineFile.parse(content)
+            return MachineFile.parse(content, parallel, workers)
 
     @staticmethod
     def interpret(
@@ -77,3 +89,99 @@ class MachineDefinitionExpressionParsers(TextParsers, whitespace=None):
     divider = lit('---\n')
     machine_file = rule_lines & opt(divider >> context_lines) << opt(rep(empty_line)) > splat(MachineFile.interpret)
 
+
+
+context_divider = '---'
+
+
+def split_machine_text(text: str) -> Tuple[List[str], str]:
+    """
+    the lines of the rule section of a machine file, and the text of its context section
+    """
+    lines = text.split('\n')
+    if context_divider in lines:
+        index = lines.index(context_divider)
+        return lines[:index], '\n'.join(lines[index + 1:])
+    if lines[-1] == '':
+        lines = lines[:-1]
+    return lines, ''
+
+
+def parse_line(line: str, number: int = 0) -> Any:
+    """
+    parses one line of the rule section, a line parses the same on its own as it does in its file, since the start
+    it records is its column
+    """
+    status = MachineDefinitionExpressionParsers.valid_line.consume(StringReader(line + '\n'))
+    if not isinstance(status, Continue) or status.remainder.position != len(line):
+        raise ValueError(f'line {number + 1} is not a valid rule or declaration: {line!r}')
+    return status.value
+
+
+def parse_lines(lines: Sequence[str], first: int = 0) -> List[Any]:
+    with packrat():
+        return [parse_line(line, first + number) for number, line in enumerate(lines)]
+
+
+def parse_context(text: str) -> Optional[Dict[ReferenceExpression, FrozenSet]]:
+    text = text.rstrip('\n')
+    if not text:
+        return None
+    result = MachineDefinitionExpressionParsers.context_lines.parse(text)
+    return dict(tuple(item) for item in result.unwrap())
+
+
+def split_blocks(lines: Sequence[str]) -> List[Tuple[int, Sequence[str]]]:
+    """
+    the top level blocks of the lines, each starts at a line without indentation and runs until the next one, paired
+    with the number of its first line
+    """
+    starts = [number for number, line in enumerate(lines) if line and not line[0].isspace()]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    ends = starts[1:] + [len(lines)]
+    return [(start, lines[start:end]) for start, end in zip(starts, ends)]
+
+
+def group_blocks(blocks: List[Tuple[int, Sequence[str]]], size: int) -> List[Tuple[int, Sequence[str]]]:
+    """
+    joins neighbouring blocks until they hold at least `size` lines, so small blocks don't each cost a round trip to
+    a worker
+    """
+    result = []
+    for start, lines in blocks:
+        if result and len(result[-1][1]) < size:
+            previous_start, previous_lines = result[-1]
+            result[-1] = (previous_start, list(previous_lines) + list(lines))
+        else:
+            result.append((start, lines))
+    return result
+
+
+def parse_block(block: Tuple[int, Sequence[str]]) -> List[Any]:
+    start, lines = block
+    return parse_lines(lines, start)
+
+
+def parse_in_parallel(text: str, workers: Optional[int] = None) -> MachineFile:
+    """
+    parses the top level blocks of a machine file on a pool of `workers` processes, one per core by default.  Lines
+    only depend on their own text, so the blocks are parsed on their own and their lines are joined back in order.  A
+    line that can't be parsed raises a ValueError
+    """
+    lines, context_text = split_machine_text(text)
+    workers = workers or os.cpu_count() or 1
+    blocks = group_blocks(split_blocks(lines), ceil(len(lines) / (workers * 4)))
+
+    if workers == 1 or len(blocks) == 1:
+        values = parse_lines(lines)
+        context = parse_context(context_text)
+    else:
+        with ProcessPoolExecutor(min(workers, len(blocks))) as executor:
+            results = executor.map(parse_block, blocks)
+            context = parse_context(context_text)
+            values = [value for result in results for value in result]
+
+    result = SeparatedList(values)
+    result.separators = ('\n',) * (len(values) - 1)
+    return MachineFile(result, context)
@@ -11,6 +11,7 @@ REFERENCE_EXPRESSION = REFERENCE_TOKEN (: REFERENCE_EXPRESSION)?
 import dataclasses
 import re
 import os
+from weakref import WeakValueDictionary
 from numbers import Number
 
 from sympy import Symbol
@@ -21,6 +22,7 @@ from parsita import TextParsers, opt, repsep, lit, longest
 from parsita.util import splat
 
 from mpl.Parser.Tokenizers.simple_value_tokenizer import SimpleValueTokenizers as svt, ReferenceToken
+from mpl.lib.parsers.packrat import memo
 
 
 def sanitize_reference_name(name: str) -> str:
@@ -36,10 +38,64 @@ pattern = rf"^REF_{this_pid}_(?P<refname>.+)"
 ref_symbol_pattern = re.compile(pattern)
 
 
-@dataclass(frozen=True, order=True)
-class Reference:
+class WeaklyReferenced:
+    # dataclass only grew weakref_slot in 3.11, slotted subclasses inherit the slot from here instead
+    __slots__ = ('__weakref__',)
+
+
+@dataclass(frozen=True, order=True, init=False, slots=True)
+class Reference(WeaklyReferenced):
+    """
+    References are interned, every distinct (name, types) pair is a single shared object while it is in use, which
+    makes equality an identity check.  The values derived from a reference are computed once and kept on it
+    """
     name: str
     types: FrozenSet[str] = frozenset()
+    _hash: Optional[int] = dataclasses.field(default=None, init=False, compare=False, repr=False)
+    _path: Optional[Tuple[str, ...]] = dataclasses.field(default=None, init=False, compare=False, repr=False)
+    _parent: Optional['Reference'] = dataclasses.field(default=None, init=False, compare=False, repr=False)
+    _void: Optional['Reference'] = dataclasses.field(default=None, init=False, compare=False, repr=False)
+    _expression: Optional['ReferenceExpression'] = dataclasses.field(default=None, init=False, compare=False, repr=False)
+    _symbol: Optional[Symbol] = dataclasses.field(default=None, init=False, compare=False, repr=False)
+    _without_types: Optional['Reference'] = dataclasses.field(default=None, init=False, compare=False, repr=False)
+
+    def __new__(cls, name: str, types: FrozenSet[str] = frozenset()):
+        key = (name, types)
+        try:
+            existing = interned_references.get(key)
+        except TypeError:
+            # types that can't be hashed can't be interned either
+            return cls.create(name, types, None)
+        if existing is None:
+            existing = interned_references.setdefault(key, cls.create(name, types, hash(key)))
+        return existing
+
+    @classmethod
+    def create(cls, name: str, types: FrozenSet[str], hash_value: Optional[int]) -> 'Reference':
+        result = object.__new__(cls)
+        object.__setattr__(result, 'name', name)
+        object.__setattr__(result, 'types', types)
+        object.__setattr__(result, '_hash', hash_value)
+        for field_name in derived_reference_fields:
+            object.__setattr__(result, field_name, None)
+        return result
+
+    def __reduce__(self):
+        return Reference, (self.name, self.types)
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if other.__class__ is not Reference:
+            return NotImplemented
+        if self._hash is not None and other._hash is not None:
+            return False
+        return (self.name, self.types) == (other.name, other.types)
+
+    def __hash__(self):
+        if self._hash is None:
+            return hash((self.name, self.types))
+        return self._hash
 
     @staticmethod
     def ROOT():
@@ -60,24 +116,34 @@ class Reference:
     def is_void(self) -> bool:
         return self.name == '*' or self.name[-2:] == '.*'
 
+    @property
+    def path(self) -> Tuple[str, ...]:
+        if self._path is None:
+            object.__setattr__(self, '_path', tuple(self.name.split('.')))
+        return self._path
+
     @property
     def parent(self) -> 'Reference':
-        tmp = self.to_reference_expression()
-        new_lineage = tmp.path[:-1]
-        parent_expr = ReferenceExpression(new_lineage, self.types)
-        return parent_expr.reference
+        if self._parent is None:
+            new_lineage = self.path[:-1]
+            parent_expr = ReferenceExpression(new_lineage, self.types)
+            object.__setattr__(self, '_parent', parent_expr.reference)
+        return self._parent
 
     @property
     def void(self) -> 'Reference':
-        return dataclasses.replace(self, name=self.name + '.*')
+        if self._void is None:
+            object.__setattr__(self, '_void', Reference(self.name + '.*', self.types))
+        return self._void
 
     @property
     def expression(self) -> 'ReferenceExpression':
         return self.to_reference_expression()
 
     def to_reference_expression(self) -> 'ReferenceExpression':
-        path = self.name.split('.')
-        return ReferenceExpression(tuple(path), self.types)
+        if self._expression is None:
+            object.__setattr__(self, '_expression', ReferenceExpression(self.path, self.types))
+        return self._expression
 
     def __str__(self):
         types_str = self.types_str
@@ -90,7 +156,9 @@ class Reference:
 
     @property
     def symbol(self):
-        return Symbol(self.name)
+        if self._symbol is None:
+            object.__setattr__(self, '_symbol', Symbol(self.name))
+        return self._symbol
 
     @staticmethod
     def decode(symbol:  Symbol) -> Union['Reference']:
@@ -98,12 +166,14 @@ class Reference:
 
     @property
     def without_types(self) -> 'Reference':
-        return dataclasses.replace(self, types=frozenset())
+        if self._without_types is None:
+            object.__setattr__(self, '_without_types', Reference(self.name))
+        return self._without_types
 
     def with_types(self, types: Union[str, Iterable[str]]) -> 'Reference':
         if isinstance(types, str):
             types = {types}
-        return dataclasses.replace(self, types=frozenset(types))
+        return Reference(self.name, frozenset(types))
 
     def is_child_of(self, other: 'Reference') -> bool:
         return self.name.startswith(other.name + '.')
@@ -154,6 +224,11 @@ class Reference:
                 return EntityValue(frozenset({x}))
 
 
+derived_reference_fields = ('_path', '_parent', '_void', '_expression', '_symbol', '_without_types')
+
+# weak, so references that nothing uses anymore are dropped, and a live reference is never replaced by another copy
+interned_references: WeakValueDictionary = WeakValueDictionary()
+
 Ref = Reference
 
 
@@ -232,6 +307,6 @@ class ReferenceExpressionParsers(TextParsers, whitespace=r'[ \t]*'):
     reference_expression = repsep(svt.reference_token, '.', min=1) & opt(type_reference) \
                            > splat(ReferenceExpression.interpret)
 
-    expression = longest(void_expression, reference_expression)
+    expression = memo(longest(void_expression, reference_expression))
 
 
@@ -1,14 +1,16 @@
 import dataclasses
 import random
 from enum import Enum, auto
+from random import Random
 
-from typing import List, Set, FrozenSet, Dict, Tuple, Union
+from typing import List, Set, FrozenSet, Dict, Tuple, Union, Iterable, Optional
 
 import networkx as nx
+import numpy as np
 
 from mpl.Parser.ExpressionParsers.reference_expression_parser import Reference
 from mpl.interpreter.expression_evaluation.entity_value import EntityValue
-from mpl.interpreter.rule_evaluation import RuleInterpretation, RuleInterpretationState
+from mpl.interpreter.rule_evaluation import RuleInterpretation, RuleInterpretationState, strong_requirements
 
 
 def compress_conflict_list(query_conflicts: List[Set[RuleInterpretation]]) -> List[Set[RuleInterpretation]]:
@@ -78,11 +80,7 @@ class InterpretationRequirementType(Enum):
 
 def generate_interpretation_requirements(target: RuleInterpretation) \
         -> Dict[Reference, Union['EntityValue', InterpretationRequirementType]]:
-    result = {}
-    for k, _ in target.changes.items():
-        result[k] = 'ADJUST'
-
-    return result | target.core_state_assertions
+    return target.requirements
 
 
 def detect_conflict(target: RuleInterpretation, candidate: RuleInterpretation) -> FrozenSet[Reference]:
@@ -138,19 +136,121 @@ def construct_conflict_map(change_graph: nx.DiGraph, interp_index: Dict[int, Rul
     return result
 
 
+@dataclasses.dataclass(frozen=True)
+class InterpretationMasks:
+    """
+    the requirements of an interpretation as bitmasks over the references of a tick.  `requirements` covers every
+    reference the interpretation adjusts or asserts, `strong` the ones it targets or consumes
+    """
+    changes: int
+    requirements: int
+    strong: int
+
+
+def set_bits(mask: int) -> Iterable[int]:
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+def generate_interpretation_masks(target: RuleInterpretation, bits: Dict[Reference, int]) -> InterpretationMasks:
+    def bit(key) -> int:
+        if key not in bits:
+            bits[key] = len(bits)
+        return 1 << bits[key]
+
+    changes = 0
+    for key in target.changes:
+        changes |= bit(key)
+
+    requirements = changes
+    for key in target.core_state_assertions:
+        requirements |= bit(key)
+
+    strong = 0
+    for key in target.strong_keys:
+        strong |= bit(key)
+
+    return InterpretationMasks(changes, requirements, strong)
+
+
+def construct_conflict_masks(interpretations: List[RuleInterpretation]) -> List[int]:
+    """
+    finds the conflicts between applicable interpretations.  Two interpretations conflict when they change a common
+    reference, and one of them targets or consumes a reference the other one also requires.
+
+    Each reference gets a bit, and for every reference we track which interpretations change, require or strongly
+    require it as a bitmask over the positions of the interpretations, so the conflicts of an interpretation are
+    found with a handful of bitwise operations.  The result holds the conflicts of each interpretation in the same
+    form
+    """
+    bits = {}
+    masks = [generate_interpretation_masks(x, bits) for x in interpretations]
+
+    changed_by = [0] * len(bits)
+    required_by = [0] * len(bits)
+    strongly_required_by = [0] * len(bits)
+
+    for position, interp_masks in enumerate(masks):
+        interp_bit = 1 << position
+        for key_bit in set_bits(interp_masks.changes):
+            changed_by[key_bit] |= interp_bit
+        for key_bit in set_bits(interp_masks.requirements):
+            required_by[key_bit] |= interp_bit
+        for key_bit in set_bits(interp_masks.strong):
+            strongly_required_by[key_bit] |= interp_bit
+
+    result = []
+    for position, interp_masks in enumerate(masks):
+        competitors = 0
+        for key_bit in set_bits(interp_masks.changes):
+            competitors |= changed_by[key_bit]
+
+        contested = 0
+        for key_bit in set_bits(interp_masks.strong):
+            contested |= required_by[key_bit]
+        for key_bit in set_bits(interp_masks.requirements & ~interp_masks.strong):
+            contested |= strongly_required_by[key_bit]
+
+        result.append(competitors & contested & ~(1 << position))
+
+    return result
+
+
 def identify_conflicts(interpretations: FrozenSet[RuleInterpretation]) \
         -> Dict[RuleInterpretation, FrozenSet[RuleInterpretation]]:
+    considered = [x for x in interpretations if x.state != RuleInterpretationState.NOT_APPLICABLE]
+    applicable = [x for x in considered if x.state == RuleInterpretationState.APPLICABLE]
 
-    tmp_graph, interp_index = construct_change_graph(interpretations)
-    result = construct_conflict_map(tmp_graph, interp_index)
+    conflict_masks = construct_conflict_masks(applicable)
+    conflicts = {
+        interp: frozenset(applicable[x] for x in set_bits(mask))
+        for interp, mask in zip(applicable, conflict_masks)
+    }
+
+    return {interp: conflicts.get(interp, frozenset()) for interp in considered}
 
-    return result
+
+def stable_order(interpretation: RuleInterpretation) -> Tuple[str, Tuple[str, ...]]:
+    """
+    a sort key for interpretations that doesn't depend on hashing, so that the same seed makes the same choices in
+    every process
+    """
+    keys = sorted(key.name if isinstance(key, Reference) else str(key) for key in interpretation.changes)
+    return interpretation.source, tuple(keys)
 
 
 def choose_outcome(
         target: RuleInterpretation,
         conflict_map: Dict[RuleInterpretation, FrozenSet[RuleInterpretation]],
-        existing_choices: InterpretationChoices) -> InterpretationChoices:
+        existing_choices: InterpretationChoices,
+        rng: Optional[Random] = None) -> InterpretationChoices:
+    """
+    accepts or rejects the target interpretation given the choices made so far, conflicts are settled with the provided
+    random number generator, or the global one when there isn't one
+    """
+    rng = rng or random
 
     if target in existing_choices.Rejected:
         return existing_choices
@@ -170,7 +270,7 @@ def choose_outcome(
         new_acceptance = existing_choices.Accepted | {target}
         return dataclasses.replace(existing_choices, Accepted=new_acceptance)
 
-    rc_list = list(remaining_conflicts)
+    rc_list = sorted(remaining_conflicts, key=stable_order)
     rc_weights = [x.scenario_weight for x in rc_list] or [0]
 
     candidates = [target] + rc_list
@@ -181,7 +281,7 @@ def choose_outcome(
     if weights == [weights[0]] * len(weights):
         weights = [1] * len(weights)
 
-    choice = random.choices(candidates, weights=weights, k=1)[0]
+    choice = rng.choices(candidates, weights=weights, k=1)[0]
 
     new_acceptance = existing_choices.Accepted | {choice}
     new_rejections = existing_choices.Rejected | conflict_map[choice]
@@ -191,11 +291,12 @@ def choose_outcome(
 
 
 def resolve_conflict_map(
-        conflict_map: Dict[RuleInterpretation, FrozenSet[RuleInterpretation]]) -> FrozenSet[RuleInterpretation]:
+        conflict_map: Dict[RuleInterpretation, FrozenSet[RuleInterpretation]],
+        rng: Optional[Random] = None) -> FrozenSet[RuleInterpretation]:
     out = InterpretationChoices()
-    sorted_keys = sorted(conflict_map.keys(), key=lambda x: len(conflict_map[x]))
+    sorted_keys = sorted(conflict_map.keys(), key=lambda x: (len(conflict_map[x]), stable_order(x)))
     for k in sorted_keys:
-        out = choose_outcome(k, conflict_map, out)
+        out = choose_outcome(k, conflict_map, out, rng)
     return out.Accepted
 
 
@@ -207,18 +308,91 @@ def compress_interpretations(interpretations: FrozenSet[RuleInterpretation]) \
     return result
 
 
-def get_resolutions(conflicts: Dict[RuleInterpretation, FrozenSet[RuleInterpretation]], trials):
+def get_resolutions(conflicts: Dict[RuleInterpretation, FrozenSet[RuleInterpretation]], trials,
+                    rng: Optional[Random] = None):
     from collections import defaultdict
     resolution_tracker = defaultdict(lambda: 0)
-    random.seed(0)
+    rng = rng or Random(0)
     for x in range(trials):
-        resolved = resolve_conflict_map(conflicts)
+        resolved = resolve_conflict_map(conflicts, rng)
         resolution_tracker[resolved] += 1
         resolution_tracker['total'] += 1
 
     return resolution_tracker
 
 
+def estimate_resolutions(
+        conflict_map: Dict[RuleInterpretation, FrozenSet[RuleInterpretation]],
+        trials: int,
+        rng: Optional[np.random.Generator] = None) -> Dict[FrozenSet[RuleInterpretation], float]:
+    """
+    runs `trials` resolutions of the conflict map at once and returns how often each set of accepted interpretations
+    came out, normalized like `normalize_tracker`.
+
+    It makes the same choices as `resolve_conflict_map`, but every trial is a row of boolean matrices over the
+    interpretations, so each key is decided for all of the trials with a few array operations, and the weighted choices
+    are sampled from the cumulative weights of their candidates
+    """
+    rng = rng or np.random.default_rng(0)
+
+    interpretations = set(conflict_map)
+    for conflicts in conflict_map.values():
+        interpretations |= conflicts
+    interpretations = sorted(interpretations, key=stable_order)
+    positions = {interp: position for position, interp in enumerate(interpretations)}
+    size = len(interpretations)
+
+    conflict_matrix = np.zeros((size, size), dtype=bool)
+    for interp, conflicts in conflict_map.items():
+        conflict_matrix[positions[interp], [positions[x] for x in conflicts]] = True
+    weights = np.array([float(x.scenario_weight) for x in interpretations], dtype=float)
+
+    accepted = np.zeros((trials, size), dtype=bool)
+    rejected = np.zeros((trials, size), dtype=bool)
+
+    sorted_keys = sorted(conflict_map.keys(), key=lambda x: (len(conflict_map[x]), stable_order(x)))
+    for key in sorted_keys:
+        target = positions[key]
+        target_conflicts = conflict_matrix[target]
+
+        open_trials = ~rejected[:, target]
+        already_accepted = open_trials & accepted[:, target]
+        rejected[already_accepted] |= target_conflicts
+
+        undecided = open_trials & ~accepted[:, target]
+        remaining = undecided[:, None] & target_conflicts & ~rejected
+        blocked = undecided & (remaining & accepted).any(axis=1)
+        rejected[blocked, target] = True
+
+        unopposed = undecided & ~blocked & ~remaining.any(axis=1)
+        accepted[unopposed, target] = True
+
+        contested = np.flatnonzero(undecided & ~blocked & remaining.any(axis=1))
+        if not contested.size:
+            continue
+
+        candidates = remaining[contested]
+        candidates[:, target] = True
+        candidate_weights = np.where(candidates, weights, 0.0)
+        lowest = np.where(candidates, candidate_weights, np.inf).min(axis=1)
+        highest = np.where(candidates, candidate_weights, -np.inf).max(axis=1)
+        # protection from zeroes, when every candidate weighs the same they are equally likely
+        candidate_weights[lowest == highest] = candidates[lowest == highest]
+
+        cumulative = candidate_weights.cumsum(axis=1)
+        draws = rng.random(len(contested)) * cumulative[:, -1]
+        choices = (cumulative > draws[:, None]).argmax(axis=1)
+
+        accepted[contested, choices] = True
+        rejected[contested] |= conflict_matrix[choices]
+
+    outcomes, counts = np.unique(accepted, axis=0, return_counts=True)
+    return {
+        frozenset(interpretations[x] for x in np.flatnonzero(outcome)): count / trials
+        for outcome, count in zip(outcomes, counts)
+    }
+
+
 def normalize_tracker(tracker):
     total = 0
     if 'total' in tracker:
@@ -1,12 +1,12 @@
 import dataclasses
-from typing import FrozenSet, Dict, Union, Set, Tuple, Optional, Iterator
+from typing import FrozenSet, Dict, Union, Set, Tuple, Optional, Iterator, Iterable
 
 from networkx import MultiDiGraph
 from sympy import Symbol
 
 from mpl.Parser.ExpressionParsers.reference_expression_parser import Reference, Ref
 from mpl.interpreter.expression_evaluation.entity_value import EntityValue, false_value
-from mpl.lib.context_tree.context_tree_implementation import ContextTree, get_node_by_ref
+from mpl.lib.context_tree.context_tree_implementation import ContextTree
 
 ref_name = Union[str, Ref]
 
@@ -95,14 +95,35 @@ class EngineContext:
     def deactivate(self, ref: ref_name | Set[ref_name]) -> Tuple['EngineContext', context_diff]:
         return self.activate(ref, EntityValue())
 
+    def add_references(self, references: Iterable[Reference]) -> Tuple['EngineContext', context_diff]:
+        """
+        adds the references that aren't in the context yet, and widens the types of the ones that are
+        """
+        new_tree = self.tree.__copy__()
+        added = []
+        for ref in references:
+            if ref.is_void:
+                continue
+            node = new_tree.get_node(ref)
+            if node is None:
+                added.append(ref)
+            elif not ref.types <= node.ref.types:
+                new_tree.change(ref, node.entity, True)
+        for ref in added:
+            new_tree.add(ref, false_value)
+        return EngineContext(new_tree), {}
+
     # endregion
 
     @property
     def symbols(self) -> FrozenSet[Symbol]:
         result = set()
-        for ref, value in self.tree:
-            if ref.types and 'symbol' in ref.types and not value:
+        for ref in self.tree.refs_of_type('symbol'):
+            node = self.tree.find(ref.name)
+            if not node.entity:
                 result.add(ref.symbol)
+            if not node.void_value:
+                result.add(ref.void.symbol)
         return frozenset(result)
 
     @property
@@ -117,17 +138,12 @@ class EngineContext:
         return frozenset(item[0].name for item in self.tree)
 
     @staticmethod
-    def from_graph(graph: MultiDiGraph) -> 'EngineContext':
-        from mpl.interpreter.reference_resolution.mpl_ontology import Relationship
+    def from_graph(graph: Union[MultiDiGraph, 'OntologyIndex']) -> 'EngineContext':
+        from mpl.interpreter.reference_resolution.mpl_ontology import ontology_index
 
-        references = frozenset({x for x in graph.nodes if isinstance(x, Reference)})
-        typed_refs: Set[Reference] = set()
-        for ref in references:
-            type_edges = graph.out_edges(ref, data='relationship')
-            types = {x[1] for x in type_edges if x[2] == Relationship.IS_A}
-            this_ref = ref.with_types(types) if not ref == Ref('ROOT') else ref
-            typed_refs.add(this_ref)
-        return EngineContext.from_references(typed_refs)
+        index = ontology_index(graph)
+        references = frozenset({x for x in index.nodes if isinstance(x, Reference)})
+        return EngineContext.from_references(index.typed(references))
 
     @staticmethod
     def from_dict(d: Dict[Reference, EntityValue]) -> 'EngineContext':
@@ -195,7 +211,7 @@ class EngineContext:
         items = {}
 
         for ref in self.active:
-            tmp = get_node_by_ref(self.tree.root, ref)
+            tmp = self.tree.get_node(ref)
             if tmp.value:
                 items[ref.name] = tmp.value
 
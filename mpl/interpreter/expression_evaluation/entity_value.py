@@ -2,13 +2,15 @@ import dataclasses
 import itertools
 from typing import FrozenSet
 
-from sympy import Symbol, Expr
+from sympy import Symbol, Expr, Integer, Float
 from sympy.core.relational import Relational, Eq
 from sympy.logic.boolalg import BooleanTrue, BooleanFalse
 
 from mpl.Parser.ExpressionParsers.reference_expression_parser import Reference, Ref
 from mpl.lib.relational_math import simplify_relational_set
 
+sympy_true = BooleanTrue()
+
 
 @dataclasses.dataclass(frozen=True)
 class EntityValue:
@@ -172,6 +174,20 @@ class EntityValue:
     # endregion
 
 
+def is_plain_number(value) -> bool:
+    # rationals are left out, sympy considers Eq(0.1, 1/10) to be true
+    return isinstance(value, (int, float, Integer, Float))
+
+
+def as_plain_number(value):
+    match value:
+        case Integer():
+            return int(value)
+        case Float():
+            return float(value)
+    return value
+
+
 def process_entity_value_equality(x: EntityValue, y: EntityValue) -> EntityValue:
     if not x and not y:
         return true_value
@@ -197,6 +213,16 @@ def process_entity_value_equality(x: EntityValue, y: EntityValue) -> EntityValue
 
     eq_results = set()
 
+    if all(map(is_plain_number, itertools.chain(x_comparable, y_comparable))):
+        # two plain numbers are either equal, or their Eq is false, so there is no need to involve sympy
+        for value_a, value_b in all_eqs:
+            if value_a == value_b:
+                eq_results |= {value_a, value_b}
+        for value_a, value_b in all_eqs:
+            if value_a not in eq_results and value_b not in eq_results:
+                return false_value
+        all_eqs = set()
+
     # region strict equality pass
 
     tmp = {(x, y) for x, y in all_eqs if x == y is True or (x == y) == BooleanTrue()}
@@ -241,13 +267,13 @@ def process_entity_value_comparison(x: EntityValue, y: EntityValue, comparison,
 
     all_relationals = x_relational | y_relational
 
-    x_has_true = {a for a in x if a is True or a is BooleanTrue()}
-    y_has_true = {a for a in y if a is True or a is BooleanTrue()}
+    x_has_true = {a for a in x if a is True or a is sympy_true}
+    y_has_true = {a for a in y if a is True or a is sympy_true}
 
     if x_has_true:
-        x = ev_fv({a for a in x if a is not True and a is not BooleanTrue()})
+        x = ev_fv({a for a in x if a is not True and a is not sympy_true})
     if y_has_true:
-        y = ev_fv({a for a in y if a is not True and a is not BooleanTrue()})
+        y = ev_fv({a for a in y if a is not True and a is not sympy_true})
 
     x_refs = {a for a in x if isinstance(a, Ref)}
     y_refs = {a for a in y if isinstance(a, Ref)}
@@ -255,7 +281,9 @@ def process_entity_value_comparison(x: EntityValue, y: EntityValue, comparison,
     x_comparable = (x.value - x_relational - x_refs) or {0}
     y_comparable = (y.value - y_relational - y_refs) or {0}
 
-    comparison_product = {(x, y, comparison(x, y)) for x, y in itertools.product(x_comparable, y_comparable)}
+    comparison_product = {
+        (a, b, compare_values(a, b, comparison)) for a, b in itertools.product(x_comparable, y_comparable)
+    }
 
     total_true = 0
     total_count = 0
@@ -284,6 +312,12 @@ def process_entity_value_comparison(x: EntityValue, y: EntityValue, comparison,
     return EntityValue(new_values, p)
 
 
+def compare_values(a, b, comparison):
+    if is_plain_number(a) and is_plain_number(b):
+        return comparison(as_plain_number(a), as_plain_number(b))
+    return comparison(a, b)
+
+
 ev_fv = EntityValue.from_value
 
 true_value = EntityValue.from_value(True)
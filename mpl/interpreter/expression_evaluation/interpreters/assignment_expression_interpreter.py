@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import dataclasses
-from typing import Dict, FrozenSet, Tuple
+from typing import Dict, FrozenSet, Tuple, Optional
 
 
 from mpl.Parser.ExpressionParsers.assignment_expression_parser import AssignmentExpression
@@ -9,7 +9,8 @@ from mpl.Parser.ExpressionParsers.reference_expression_parser import Reference
 from mpl.interpreter.expression_evaluation.engine_context import EngineContext
 from mpl.interpreter.expression_evaluation.entity_value import EntityValue
 from mpl.interpreter.expression_evaluation.interpreters.expression_interpreter import ExpressionInterpreter
-from mpl.interpreter.expression_evaluation.stack_management import evaluate_symbolized_postfix_stack
+from mpl.interpreter.expression_evaluation.stack_management import evaluate_symbolized_postfix_stack, \
+    CompiledPostfixStack
 from mpl.interpreter.expression_evaluation.types import symbolized_postfix_stack
 from mpl.lib.context_tree.context_tree_implementation import ContextTree
 
@@ -25,9 +26,13 @@ class AssignmentExpressionInterpreter(ExpressionInterpreter):
     expression: AssignmentExpression
     reference: Reference
     symbolized: symbolized_postfix_stack
+    evaluator: Optional[CompiledPostfixStack] = dataclasses.field(default=None, compare=False, repr=False)
 
     def interpret(self, context: EngineContext) -> AssignmentResult:
-        target_value = evaluate_symbolized_postfix_stack(self.symbolized, context)
+        if self.evaluator:
+            target_value = self.evaluator(context)
+        else:
+            target_value = evaluate_symbolized_postfix_stack(self.symbolized, context)
         _, diff = context.set(self.reference, target_value)
         change = {k: v[1] for k, v in diff.items() if v is not None}
         return AssignmentResult(target_value, change)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Union
+from functools import lru_cache
+from typing import Union, Optional
 
 from mpl.Parser.ExpressionParsers.assignment_expression_parser import AssignmentExpression
 from mpl.Parser.ExpressionParsers.query_expression_parser import QueryExpression
@@ -14,34 +15,71 @@ from mpl.interpreter.expression_evaluation.interpreters.scenario_expression_inte
 from mpl.interpreter.expression_evaluation.interpreters.target_exprression_interpreter import target_operations_dict, \
     TargetExpressionInterpreter
 from mpl.interpreter.expression_evaluation.operators import query_operations_dict, OperationType
-from mpl.interpreter.expression_evaluation.stack_management import symbolize_expression
+from mpl.interpreter.expression_evaluation.stack_management import symbolize_expression, \
+    CompiledPostfixStack
+from mpl.interpreter.expression_evaluation.types import symbolized_postfix_stack
+
+
+def compile_stack(stack: symbolized_postfix_stack, compiled: bool) -> Optional[CompiledPostfixStack]:
+    if not compiled:
+        return None
+    return CompiledPostfixStack(stack)
+
+
+# interpreters are built again for every ad hoc rule, activation and added rule, and they don't change once built, so
+# the ones built for the same expressions are shared
+expression_interpreter_cache_size = 4096
 
 
 def create_expression_interpreter(
         expression: Union[QueryExpression, AssignmentExpression, 'ScenarioExpression'],
-        as_target: bool = False
+        as_target: bool = False,
+        compiled: bool = True
+) -> ExpressionInterpreter:
+    """
+    compiled interpreters evaluate their stack through a CompiledPostfixStack instead of walking it on each call
+    """
+    return cached_create_expression_interpreter(expression, as_target, compiled)
+
+
+@lru_cache(maxsize=expression_interpreter_cache_size)
+def cached_create_expression_interpreter(
+        expression: Union[QueryExpression, AssignmentExpression, 'ScenarioExpression'],
+        as_target: bool,
+        compiled: bool
 ) -> ExpressionInterpreter:
     from mpl.Parser.ExpressionParsers.scenario_expression_parser import ScenarioExpression
     match expression:
         case QueryExpression() if as_target:
             stack = symbolize_expression(expression, target_operations_dict)
-            return TargetExpressionInterpreter(expression, stack)
+            return TargetExpressionInterpreter(expression, stack, compile_stack(stack, compiled))
         case QueryExpression():
             stack = symbolize_expression(expression)
-            return QueryExpressionInterpreter(expression, stack)
+            return QueryExpressionInterpreter(expression, stack, compile_stack(stack, compiled))
         case ScenarioExpression():
             stack = symbolize_expression(expression.value)
-            return ScenarioExpressionInterpreter(expression, stack)
+            return ScenarioExpressionInterpreter(expression, stack, compile_stack(stack, compiled))
         case AssignmentExpression():
             operator = query_operations_dict[expression.operator.contents]
             reference = expression.lhs.reference
             match operator.operation_type:
                 case OperationType.Assign:
                     stack = symbolize_expression(expression.rhs)
-                    return AssignmentExpressionInterpreter(expression, reference, stack)
+                    return AssignmentExpressionInterpreter(expression, reference, stack, compile_stack(stack, compiled))
                 case OperationType.Increment:
                     normal_sign = operator.sign.replace("=", "")
                     query_operator = QueryOperator(normal_sign)
                     tmp = QueryExpression((expression.lhs, expression.rhs), (query_operator,))
                     stack = symbolize_expression(tmp)
-                    return AssignmentExpressionInterpreter(expression, reference, stack)
\ No newline at end of file
+                    return AssignmentExpressionInterpreter(expression, reference, stack, compile_stack(stack, compiled))
+
+
+def expression_interpreter_cache_info():
+    """
+    hits, misses, maxsize and currsize of the cache behind create_expression_interpreter
+    """
+    return cached_create_expression_interpreter.cache_info()
+
+
+def clear_expression_interpreter_cache():
+    cached_create_expression_interpreter.cache_clear()
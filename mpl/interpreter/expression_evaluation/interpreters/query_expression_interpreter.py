@@ -1,6 +1,6 @@
 import dataclasses
 from dataclasses import dataclass
-from typing import Union, FrozenSet
+from typing import Union, FrozenSet, Optional
 
 from sympy import Expr
 from sympy.core.relational import Relational
@@ -10,7 +10,8 @@ from mpl.Parser.ExpressionParsers.reference_expression_parser import Reference
 from mpl.interpreter.expression_evaluation.entity_value import EntityValue
 
 from mpl.interpreter.expression_evaluation.interpreters.expression_interpreter import ExpressionInterpreter
-from mpl.interpreter.expression_evaluation.stack_management import evaluate_symbolized_postfix_stack
+from mpl.interpreter.expression_evaluation.stack_management import evaluate_symbolized_postfix_stack, \
+    CompiledPostfixStack
 from mpl.interpreter.expression_evaluation.types import ExpressionResult, symbolized_postfix_stack
 from mpl.lib.context_tree.context_tree_implementation import ContextTree
 
@@ -25,9 +26,13 @@ class QueryExpressionInterpreter(ExpressionInterpreter):
 
     expression: QueryExpression
     symbolized: symbolized_postfix_stack
+    evaluator: Optional[CompiledPostfixStack] = dataclasses.field(default=None, compare=False, repr=False)
 
     def interpret(self, context: ContextTree) -> QueryResult:
-        result = evaluate_symbolized_postfix_stack(self.symbolized, context)
+        if self.evaluator:
+            result = self.evaluator(context)
+        else:
+            result = evaluate_symbolized_postfix_stack(self.symbolized, context)
         return QueryResult(result)
 
     @staticmethod
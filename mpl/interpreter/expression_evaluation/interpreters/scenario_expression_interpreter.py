@@ -6,7 +6,8 @@ from mpl.Parser.ExpressionParsers.query_expression_parser import QueryExpression
 from mpl.Parser.ExpressionParsers.reference_expression_parser import Reference
 from mpl.interpreter.expression_evaluation.entity_value import EntityValue
 from mpl.interpreter.expression_evaluation.interpreters.expression_interpreter import ExpressionInterpreter
-from mpl.interpreter.expression_evaluation.stack_management import evaluate_symbolized_postfix_stack
+from mpl.interpreter.expression_evaluation.stack_management import evaluate_symbolized_postfix_stack, \
+    CompiledPostfixStack
 from mpl.interpreter.expression_evaluation.types import symbolized_postfix_stack
 from mpl.lib.context_tree.context_tree_implementation import ContextTree
 
@@ -36,9 +37,13 @@ class ScenarioResult:
 class ScenarioExpressionInterpreter(ExpressionInterpreter):
     expression: QueryExpression
     symbolized: symbolized_postfix_stack
+    evaluator: Optional[CompiledPostfixStack] = dataclasses.field(default=None, compare=False, repr=False)
 
     def interpret(self, context: ContextTree) -> ScenarioResult:
-        value = evaluate_symbolized_postfix_stack(self.symbolized, context)
+        if self.evaluator:
+            value = self.evaluator(context)
+        else:
+            value = evaluate_symbolized_postfix_stack(self.symbolized, context)
         return ScenarioResult(value)
 
     @property
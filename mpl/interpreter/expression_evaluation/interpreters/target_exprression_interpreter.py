@@ -1,6 +1,6 @@
 import dataclasses
 from dataclasses import dataclass
-from typing import FrozenSet
+from typing import FrozenSet, Optional
 
 from mpl.Parser.ExpressionParsers.query_expression_parser import QueryExpression
 from mpl.Parser.ExpressionParsers.reference_expression_parser import Reference
@@ -8,7 +8,8 @@ from mpl.interpreter.expression_evaluation.entity_value import EntityValue
 from mpl.interpreter.expression_evaluation.interpreters.expression_interpreter import ExpressionInterpreter
 from mpl.interpreter.expression_evaluation.interpreters.query_expression_interpreter import QueryExpressionInterpreter
 from mpl.interpreter.expression_evaluation.operators import OperatorOperation, OperationType, query_operations_dict
-from mpl.interpreter.expression_evaluation.stack_management import evaluate_symbolized_postfix_stack
+from mpl.interpreter.expression_evaluation.stack_management import evaluate_symbolized_postfix_stack, \
+    CompiledPostfixStack
 from mpl.interpreter.expression_evaluation.types import ExpressionResult, symbolized_postfix_stack
 from mpl.lib.context_tree.context_tree_implementation import ContextTree
 from mpl.lib.query_logic.target_operations import target_xor, target_and, target_or
@@ -32,9 +33,13 @@ class TargetExpressionInterpreter(ExpressionInterpreter):
 
     expression: QueryExpression
     symbolized: symbolized_postfix_stack
+    evaluator: Optional[CompiledPostfixStack] = dataclasses.field(default=None, compare=False, repr=False)
 
     def interpret(self, context: ContextTree) -> TargetResult:
-        result = evaluate_symbolized_postfix_stack(self.symbolized, context)
+        if self.evaluator:
+            result = self.evaluator(context)
+        else:
+            result = evaluate_symbolized_postfix_stack(self.symbolized, context)
         return TargetResult(result)
 
     @property
@@ -20,6 +20,12 @@ class OperatorOperation:
     operation_type: OperationType
     method: Callable[[Any, Any], Any]
 
+    def __reduce__(self):
+        # most methods are lambdas, which can't be pickled, so the standard operations are pickled by their sign
+        if query_operations_dict.get(self.sign) is self:
+            return get_query_operation, (self.sign,)
+        return OperatorOperation, (self.sign, self.score, self.operation_type, self.method)
+
 
 operations = [
     OperatorOperation('!', 9, OperationType.Unary, query_negate),
@@ -48,3 +54,7 @@ operations = [
 ]
 
 query_operations_dict = dict([(x.sign, x) for x in operations])
+
+
+def get_query_operation(sign: str) -> OperatorOperation:
+    return query_operations_dict[sign]
@@ -1,7 +1,8 @@
 from ast import literal_eval
+from functools import partial
 from numbers import Number
 from operator import itemgetter
-from typing import Dict, List
+from typing import Dict, List, Callable
 
 from sympy import Expr, Symbol
 from sympy.core.relational import Relational
@@ -142,4 +143,72 @@ def evaluate_symbolized_postfix_stack(
     assert isinstance(out, EntityValue)
     out = out.clean
     out = simplify_entity_value(out, context)
-    return out
\ No newline at end of file
+    return out
+
+
+operand_evaluator = Callable[['EngineContext'], EntityValue]
+
+
+def constant_operand(value: EntityValue, context: 'EngineContext') -> EntityValue:
+    return value
+
+
+def unary_operation(method: Callable, operand: operand_evaluator, context: 'EngineContext') -> EntityValue:
+    return method(operand(context))
+
+
+def binary_operation(method: Callable, lhs: operand_evaluator, rhs: operand_evaluator, context: 'EngineContext') \
+        -> EntityValue:
+    return method(lhs(context), rhs(context))
+
+
+def compile_symbolized_postfix_stack(postfix_queue: symbolized_postfix_stack) -> operand_evaluator:
+    """
+    resolves a postfix stack into a tree of calls, an equivalent of evaluate_symbolized_postfix_stack that doesn't
+    need to match every item of the stack again on each evaluation
+    """
+    operands: List[operand_evaluator] = []
+    for item in postfix_queue:
+        match item:
+            case Number() | str():
+                operands.append(partial(constant_operand, EntityValue.from_value(item)))
+            case EntityValue():
+                operands.append(partial(constant_operand, item))
+            case Expr() | Relational():
+                operands.append(partial(entity_value_from_expression, item))
+            case OperatorOperation() if item.operation_type == OperationType.Unary:
+                operand = operands.pop()
+                operands.append(partial(unary_operation, item.method, operand))
+            case OperatorOperation():
+                rhs = operands.pop()
+                lhs = operands.pop()
+                operands.append(partial(binary_operation, item.method, lhs, rhs))
+            case x:
+                raise ValueError(f'Cannot compile {x} in {postfix_queue}')
+
+    assert len(operands) == 1
+    return operands[0]
+
+
+class CompiledPostfixStack:
+    """
+    a symbolized postfix stack compiled once, calling it with a context evaluates the stack
+    """
+
+    def __init__(self, postfix_queue: symbolized_postfix_stack):
+        self.postfix_queue = postfix_queue
+        self.evaluate = compile_symbolized_postfix_stack(postfix_queue)
+
+    def __call__(self, context: 'EngineContext') -> EntityValue:
+        out = self.evaluate(context)
+        assert isinstance(out, EntityValue)
+        out = out.clean
+        out = simplify_entity_value(out, context)
+        return out
+
+    def __reduce__(self):
+        # the compiled calls can't be pickled, so they are rebuilt from the stack
+        return CompiledPostfixStack, (self.postfix_queue,)
+
+    def __repr__(self):
+        return f'CompiledPostfixStack({self.postfix_queue})'
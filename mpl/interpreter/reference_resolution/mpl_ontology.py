@@ -1,7 +1,7 @@
 
 import dataclasses
 from enum import Enum
-from typing import List, Tuple, Set, Optional, FrozenSet, Dict, Union
+from typing import List, Tuple, Set, Optional, FrozenSet, Dict, Union, Any, Iterable
 
 from networkx import MultiDiGraph
 
@@ -18,6 +18,105 @@ class Relationship(Enum):
     DEFINED_IN = "defined in"
 
 
+# the neighbours of each node by relationship, neighbours are kept in dicts so that they stay in insertion order
+relationship_map = Dict[Relationship, Dict[Any, Dict[Any, None]]]
+
+
+@dataclasses.dataclass
+class OntologyIndex:
+    """
+    the edges of an ontology graph, indexed by relationship from their source to their target and back.  Indexes
+    shared between engines are copied before they are changed
+    """
+    forward: relationship_map = dataclasses.field(default_factory=dict)
+    reverse: relationship_map = dataclasses.field(default_factory=dict)
+    graph: Optional[MultiDiGraph] = None
+    shared: bool = False
+    # the sources of each target over every relationship, in the order the graph lists its predecessors
+    predecessors: Dict[Any, Dict[Any, None]] = dataclasses.field(default_factory=dict)
+
+    @staticmethod
+    def from_graph(graph: MultiDiGraph) -> 'OntologyIndex':
+        result = OntologyIndex(graph=graph)
+        result.add_graph(graph)
+        return result
+
+    def add_graph(self, graph: MultiDiGraph):
+        for source, target, relationship in graph.out_edges(data='relationship'):
+            self.forward.setdefault(relationship, {}).setdefault(source, {})[target] = None
+        for source, target, relationship in graph.in_edges(data='relationship'):
+            self.reverse.setdefault(relationship, {}).setdefault(target, {})[source] = None
+            self.predecessors.setdefault(target, {})[source] = None
+
+    def add_edge(self, source: Any, target: Any, relationship: Relationship):
+        self.forward.setdefault(relationship, {}).setdefault(source, {})[target] = None
+        self.reverse.setdefault(relationship, {}).setdefault(target, {})[source] = None
+        self.predecessors.setdefault(target, {})[source] = None
+
+    def remove_nodes(self, nodes: Iterable):
+        """
+        drops every edge to or from the provided nodes
+        """
+        for node in nodes:
+            self.predecessors.pop(node, None)
+            for targets in self.forward.values():
+                for target in targets.get(node, ()):
+                    sources = self.predecessors.get(target)
+                    if sources is not None:
+                        sources.pop(node, None)
+            for index, other_index in ((self.forward, self.reverse), (self.reverse, self.forward)):
+                for relationship, neighbours in index.items():
+                    for neighbour in neighbours.pop(node, ()):
+                        others = other_index[relationship][neighbour]
+                        others.pop(node, None)
+                        if not others:
+                            del other_index[relationship][neighbour]
+
+    def targets(self, source: Any, relationship: Relationship) -> Tuple:
+        return tuple(self.forward.get(relationship, {}).get(source, ()))
+
+    def sources(self, target: Any, relationship: Relationship) -> Tuple:
+        return tuple(self.reverse.get(relationship, {}).get(target, ()))
+
+    def all_sources(self, target: Any) -> Tuple:
+        """
+        the sources of every edge to the target, in the order their first edge was added
+        """
+        return tuple(self.predecessors.get(target, ()))
+
+    def types(self, ref: Reference) -> FrozenSet[str]:
+        return frozenset(self.forward.get(Relationship.IS_A, {}).get(ref, ()))
+
+    def typed(self, references: Iterable[Reference]) -> Set[Reference]:
+        """
+        the references with the types the graph assigns to them, the root keeps its bare reference
+        """
+        return {ref.with_types(self.types(ref)) if ref != Ref('ROOT') else ref for ref in references}
+
+    @property
+    def nodes(self) -> Set:
+        result = set()
+        for index in (self.forward, self.reverse):
+            for neighbours in index.values():
+                result |= neighbours.keys()
+        return result
+
+    def __copy__(self) -> 'OntologyIndex':
+        def copy_map(index: relationship_map) -> relationship_map:
+            return {
+                relationship: {node: dict(others) for node, others in neighbours.items()}
+                for relationship, neighbours in index.items()
+            }
+        predecessors = {target: dict(sources) for target, sources in self.predecessors.items()}
+        return OntologyIndex(copy_map(self.forward), copy_map(self.reverse), self.graph, predecessors=predecessors)
+
+
+def ontology_index(graph: MultiDiGraph | OntologyIndex) -> OntologyIndex:
+    if isinstance(graph, OntologyIndex):
+        return graph
+    return OntologyIndex.from_graph(graph)
+
+
 @dataclasses.dataclass(frozen=True, order=True)
 class PathInfo:
     names: Tuple[str, ...]
@@ -126,11 +225,10 @@ def machine_file_context_to_engine_context(context: Dict[ReferenceExpression, Fr
     return result
 
 
-def get_refs_missing_relationship(G: MultiDiGraph, relationship: Relationship) -> Set[Reference]:
-    edges = G.edges(data='relationship')
-    filtered = filter(lambda edge: edge[2] == relationship, edges)
-    not_applicable = set(map(lambda edge: edge[0], filtered))
-    refs = filter(lambda ref: isinstance(ref, Reference) and ref not in not_applicable, G.nodes())
+def get_refs_missing_relationship(G: MultiDiGraph | OntologyIndex, relationship: Relationship) -> Set[Reference]:
+    index = ontology_index(G)
+    not_applicable = index.forward.get(relationship, {})
+    refs = filter(lambda ref: isinstance(ref, Reference) and ref not in not_applicable, index.nodes)
     return set(refs)
 
 
@@ -142,8 +240,9 @@ def assign_missing_types(G: MultiDiGraph) -> MultiDiGraph:
 
 
 def assign_missing_parents(G: MultiDiGraph) -> MultiDiGraph:
+    index = OntologyIndex.from_graph(G)
     while True:
-        refs = get_refs_missing_relationship(G, Relationship.DEFINED_IN)
+        refs = get_refs_missing_relationship(index, Relationship.DEFINED_IN)
         if not refs:
             return G
         for ref in refs:
@@ -153,6 +252,7 @@ def assign_missing_parents(G: MultiDiGraph) -> MultiDiGraph:
             if not expected_parent.name:
                 expected_parent = Ref('ROOT')
             G.add_edge(ref, expected_parent, relationship=Relationship.DEFINED_IN)
+            index.add_edge(ref, expected_parent, Relationship.DEFINED_IN)
 
 
 def process_machine_file(file: MachineFile) -> (EngineContext, MultiDiGraph, Set):
@@ -175,18 +275,12 @@ def get_edges_by_type(G: MultiDiGraph, types: str|Set[str]) -> List[Tuple[str, s
     return [(u, v) for u, v, d in G.edges(data=True) if d['type'] in types]
 
 
-def rule_expressions_from_graph(G: MultiDiGraph) -> FrozenSet[RuleExpression]:
-    rule_edges = G.in_edges('rule', data='relationship')
-    rule_expressions = set()
-
-    for origin, _, type in rule_edges:
-        match origin, type:
-            case RuleExpression(), Relationship.IS_A:
-                rule_expressions.add(origin)
-    return frozenset(rule_expressions)
+def rule_expressions_from_graph(G: MultiDiGraph | OntologyIndex) -> FrozenSet[RuleExpression]:
+    origins = ontology_index(G).sources('rule', Relationship.IS_A)
+    return frozenset(origin for origin in origins if isinstance(origin, RuleExpression))
 
 
-def reference_expression_from_ref(ref: Reference, G:MultiDiGraph) -> ReferenceExpression:
+def reference_expression_from_ref(ref: Reference, G: MultiDiGraph | OntologyIndex) -> ReferenceExpression:
 
     types = get_reference_types(G, ref)
 
@@ -203,24 +297,20 @@ def unqualify_reference_expression(expr: ReferenceExpression, parent:ReferenceEx
     return dataclasses.replace(expr, path=new_path, parent=parent)
 
 
-def get_reference_types(graph: MultiDiGraph, ref: Reference) -> FrozenSet[str]:
-    if ref not in graph.nodes:
-        return frozenset()
-    out_edges = list(graph.out_edges(ref, data='relationship'))
-    return frozenset([x[1] for x in out_edges if x[2] == Relationship.IS_A])
+def get_reference_types(graph: MultiDiGraph | OntologyIndex, ref: Reference) -> FrozenSet[str]:
+    return ontology_index(graph).types(ref)
 
 
-def get_parent_references(G: MultiDiGraph, ref: Reference) -> List[Reference]:
-    out_edges = list(G.out_edges(ref, data='relationship'))
-    return [x[1] for x in out_edges if x[2] == Relationship.DEFINED_IN]
+def get_parent_references(G: MultiDiGraph | OntologyIndex, ref: Reference) -> List[Reference]:
+    return list(ontology_index(G).targets(ref, Relationship.DEFINED_IN))
 
 
-def get_child_references(G: MultiDiGraph, ref: Reference) -> List[Reference]:
-    in_edges = list(G.in_edges(ref, data='relationship'))
-    return [x[0] for x in in_edges if x[2] == Relationship.DEFINED_IN]
+def get_child_references(G: MultiDiGraph | OntologyIndex, ref: Reference) -> List[Reference]:
+    return list(ontology_index(G).sources(ref, Relationship.DEFINED_IN))
 
 
-def get_unqualified_typed_ref(G: MultiDiGraph, ref: Reference) -> ReferenceExpression:
+def get_unqualified_typed_ref(G: MultiDiGraph | OntologyIndex, ref: Reference) -> ReferenceExpression:
+    G = ontology_index(G)
     types = get_reference_types(G, ref)
     my_ref_expr = reference_expression_from_ref(ref, G)
     parent_ref = get_parent_references(G, ref)[0]
@@ -232,17 +322,13 @@ def get_unqualified_typed_ref(G: MultiDiGraph, ref: Reference) -> ReferenceExpre
 TreeNode = Tuple[ReferenceExpression, List[Union['TreeNode', RuleExpression]]]
 
 
-def get_child_rules(ref: ReferenceExpression, G: MultiDiGraph) -> List[RuleExpression]:
-    result = []
-
-    for child, _, relationship in G.in_edges(ref.reference.without_types, data='relationship'):
-        if relationship != Relationship.RUNS_IN:
-            continue
-        result.append(child)
-    return result
+def get_child_rules(ref: ReferenceExpression, G: MultiDiGraph | OntologyIndex) -> List[RuleExpression]:
+    return list(ontology_index(G).sources(ref.reference.without_types, Relationship.RUNS_IN))
 
 
-def get_child_rules_and_references(ref: ReferenceExpression, graph: MultiDiGraph) -> List[TreeNode | RuleExpression]:
+def get_child_rules_and_references(ref: ReferenceExpression, graph: MultiDiGraph | OntologyIndex) \
+        -> List[TreeNode | RuleExpression]:
+    graph = ontology_index(graph)
     child_refences = get_child_references(graph, ref.reference)
     results = []
     for child_ref in child_refences:
@@ -256,11 +342,12 @@ def get_child_rules_and_references(ref: ReferenceExpression, graph: MultiDiGraph
     return results + sorted(unqualified_rules, key=str)
 
 
-def get_entity_tree_from_graph(G: MultiDiGraph) -> List[TreeNode]:
-    root_edges = list(G.in_edges('engine root', data='relationship'))
+def get_entity_tree_from_graph(G: MultiDiGraph | OntologyIndex) -> List[TreeNode]:
+    G = ontology_index(G)
+    root_children = G.all_sources('engine root')
     result = []
-    refs = [x[0] for x in root_edges if isinstance(x[0], Reference)]
-    rules = [x[0] for x in root_edges if isinstance(x[0], RuleExpression)]
+    refs = [x for x in root_children if isinstance(x, Reference)]
+    rules = [x for x in root_children if isinstance(x, RuleExpression)]
 
     for ref in refs:
         expr = ref.to_reference_expression()
@@ -288,7 +375,7 @@ def entity_tree_to_string(tree: List[TreeNode | RuleExpression], depth: int = 0)
 
 
 def engine_to_string(engine: 'MPLEngine') -> str:
-    entity_tree = get_entity_tree_from_graph(engine.graph)
+    entity_tree = get_entity_tree_from_graph(engine.ontology)
     result = entity_tree_to_string(entity_tree)
     if engine.active:
         result += f"\n---\n{engine.context}\n"
@@ -296,8 +383,9 @@ def engine_to_string(engine: 'MPLEngine') -> str:
     return result
 
 
-def get_sibling_groups(graph: MultiDiGraph) -> Dict[Reference, Set[Reference]]:
-    refs = {x for x in graph.nodes() if isinstance(x, Reference) and not x.is_void}
+def get_sibling_groups(graph: MultiDiGraph | OntologyIndex) -> Dict[Reference, Set[Reference]]:
+    graph = ontology_index(graph)
+    refs = {x for x in graph.nodes if isinstance(x, Reference) and not x.is_void}
     result = dict()
     for ref in refs:
         parent = get_parent_references(graph, ref)[0]
@@ -306,8 +394,9 @@ def get_sibling_groups(graph: MultiDiGraph) -> Dict[Reference, Set[Reference]]:
     return result
 
 
-def get_type_map(graph: MultiDiGraph) -> Dict[Reference, FrozenSet[str]]:
-    refs = {x for x in graph.nodes() if isinstance(x, Reference) and not x.is_void}
+def get_type_map(graph: MultiDiGraph | OntologyIndex) -> Dict[Reference, FrozenSet[str]]:
+    graph = ontology_index(graph)
+    refs = {x for x in graph.nodes if isinstance(x, Reference) and not x.is_void}
     result: Dict[Reference, FrozenSet[str]] = dict()
     for ref in refs:
         types = get_reference_types(graph, ref)
@@ -315,8 +404,9 @@ def get_type_map(graph: MultiDiGraph) -> Dict[Reference, FrozenSet[str]]:
     return result
 
 
-def get_parent_map(g: MultiDiGraph) -> Dict[Reference, Reference]:
-    refs = {x for x in g.nodes() if isinstance(x, Reference) and not x.is_void}
+def get_parent_map(g: MultiDiGraph | OntologyIndex) -> Dict[Reference, Reference]:
+    g = ontology_index(g)
+    refs = {x for x in g.nodes if isinstance(x, Reference) and not x.is_void}
     result = dict()
     for ref in refs:
         parents = get_parent_references(g, ref)
@@ -327,8 +417,9 @@ def get_parent_map(g: MultiDiGraph) -> Dict[Reference, Reference]:
     return result
 
 
-def get_child_map(graph: MultiDiGraph) -> Dict[Reference, Set[Reference]]:
-    refs = {x for x in graph.nodes() if isinstance(x, Reference) and not x.is_void}
+def get_child_map(graph: MultiDiGraph | OntologyIndex) -> Dict[Reference, Set[Reference]]:
+    graph = ontology_index(graph)
+    refs = {x for x in graph.nodes if isinstance(x, Reference) and not x.is_void}
     result = dict()
     for ref in refs:
         children = set(get_child_references(graph, ref))
@@ -337,7 +428,8 @@ def get_child_map(graph: MultiDiGraph) -> Dict[Reference, Set[Reference]]:
     return result
 
 
-def get_all_descendants(graph: MultiDiGraph, ref: Reference) -> Set[Reference]:
+def get_all_descendants(graph: MultiDiGraph | OntologyIndex, ref: Reference) -> Set[Reference]:
+    graph = ontology_index(graph)
     result = set()
     for child in get_child_references(graph, ref):
         result.add(child)
@@ -345,8 +437,9 @@ def get_all_descendants(graph: MultiDiGraph, ref: Reference) -> Set[Reference]:
     return result
 
 
-def get_descendant_map(graph: MultiDiGraph) -> Dict[Reference, Set[Reference]]:
-    refs = {x for x in graph.nodes() if isinstance(x, Reference) and not x.is_void}
+def get_descendant_map(graph: MultiDiGraph | OntologyIndex) -> Dict[Reference, Set[Reference]]:
+    graph = ontology_index(graph)
+    refs = {x for x in graph.nodes if isinstance(x, Reference) and not x.is_void}
     result = dict()
     for ref in refs:
         result[ref] = get_all_descendants(graph, ref)
@@ -31,16 +31,43 @@ class RuleInterpretationState(Enum):
     UNDETERMINED = auto()
 
 
-@dataclasses.dataclass(frozen=True, order=True)
+strong_requirements = frozenset({'TARGET', 'CONSUME'})
+
+
+@dataclasses.dataclass(frozen=True, order=True, slots=True)
 class RuleInterpretation:
+    """
+    Interpretations are hashed and compared over and over while conflicts are resolved, so their hash, keys,
+    requirements and weight are computed once, when they are created.  Their changes and assertions must not be
+    modified afterwards
+    """
     state: RuleInterpretationState
     changes: Dict[Reference | str, Tuple[EntityValue, EntityValue]]
     source: str = ''
     scenarios: FrozenSet[ScenarioResult] = frozenset()
     core_state_assertions: Dict[Reference, str | EntityValue] = dataclasses.field(default_factory=dict)
+    _hash: int = dataclasses.field(default=0, init=False, compare=False, repr=False)
+    _keys: FrozenSet[Reference] = dataclasses.field(default=empty_set, init=False, compare=False, repr=False)
+    _requirements: Dict[Reference, str | EntityValue] = \
+        dataclasses.field(default=None, init=False, compare=False, repr=False)
+    _strong_keys: FrozenSet[Reference] = dataclasses.field(default=empty_set, init=False, compare=False, repr=False)
+    _scenario_weight: Number = dataclasses.field(default=0, init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        hash_value = hash(
+            (
+                self.source,
+                self.state,
+                frozenset(self.changes.items()),
+                frozenset(self.core_state_assertions.items()),
+                self.scenarios
+            )
+        )
+        requirements = {k: 'ADJUST' for k in self.changes} | self.core_state_assertions
+        strong_keys = frozenset(
+            k for k, v in self.core_state_assertions.items() if isinstance(v, str) and v in strong_requirements
+        )
 
-    @property
-    def scenario_weight(self) -> int:
         total_weight = 0
         for scenario in self.scenarios:
             match scenario:
@@ -49,22 +76,36 @@ class RuleInterpretation:
                 case Number() as x:
                     total_weight += x
 
-        return total_weight
+        object.__setattr__(self, '_hash', hash_value)
+        object.__setattr__(self, '_keys', frozenset(self.changes))
+        object.__setattr__(self, '_requirements', requirements)
+        object.__setattr__(self, '_strong_keys', strong_keys)
+        object.__setattr__(self, '_scenario_weight', total_weight)
+
+    @property
+    def scenario_weight(self) -> int:
+        return self._scenario_weight
 
     @property
     def keys(self) -> FrozenSet[Reference]:
-        return frozenset(self.changes.keys())
+        return self._keys
+
+    @property
+    def requirements(self) -> Dict[Reference, str | EntityValue]:
+        """
+        every reference the interpretation changes or asserts, changed references that aren't asserted are 'ADJUST'
+        """
+        return self._requirements
+
+    @property
+    def strong_keys(self) -> FrozenSet[Reference]:
+        """
+        the references the interpretation targets or consumes
+        """
+        return self._strong_keys
 
     def __hash__(self):
-        return hash(
-            (
-                self.source,
-                self.state,
-                frozenset(self.changes.items()),
-                frozenset(self.core_state_assertions.items()),
-                self.scenarios
-            )
-        )
+        return self._hash
 
     def __repr__(self):
         tmp = [f'{k}:{v0}->{v1}' for k, (v0, v1) in sorted(self.changes.items(), key=lambda x: x[0])]
@@ -0,0 +1,42 @@
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import List, Iterator, Tuple, Optional
+
+from mpl.Parser.ExpressionParsers.reference_expression_parser import Reference
+from mpl.interpreter.expression_evaluation.engine_context import context_diff
+from mpl.interpreter.expression_evaluation.entity_value import EntityValue
+
+change_row = Tuple[int, Reference | str, Optional[EntityValue], Optional[EntityValue]]
+
+
+@dataclass
+class ChangeLog:
+    """
+    The changes made over a run of ticks, stored as columns.  Row n says that on tick `ticks[n]` the entity of
+    `references[n]` went from `old[n]` to `new[n]`.  Rows are in tick order
+    """
+    ticks: List[int] = field(default_factory=list)
+    references: List[Reference | str] = field(default_factory=list)
+    old: List[Optional[EntityValue]] = field(default_factory=list)
+    new: List[Optional[EntityValue]] = field(default_factory=list)
+
+    def extend(self, tick: int, diff: context_diff):
+        for ref, (old_value, new_value) in diff.items():
+            self.ticks.append(tick)
+            self.references.append(ref)
+            self.old.append(old_value)
+            self.new.append(new_value)
+
+    def at(self, tick: int) -> context_diff:
+        """
+        the changes made on the provided tick
+        """
+        start = bisect_left(self.ticks, tick)
+        end = bisect_right(self.ticks, tick, start)
+        return {self.references[x]: (self.old[x], self.new[x]) for x in range(start, end)}
+
+    def __len__(self) -> int:
+        return len(self.ticks)
+
+    def __iter__(self) -> Iterator[change_row]:
+        return zip(self.ticks, self.references, self.old, self.new)
@@ -0,0 +1,92 @@
+import mmap
+import pickle
+import tempfile
+from collections import deque
+from copy import copy
+from dataclasses import dataclass, field
+from typing import Optional, Deque, List, Tuple, Iterable, Iterator, BinaryIO
+
+from mpl.interpreter.expression_evaluation.engine_context import context_diff
+
+
+@dataclass(eq=False)
+class History:
+    """
+    The diffs of the ticks an engine ran, indexed and iterated newest first.
+
+    Once there are more than `limit` entries, the oldest ones are dropped, or written to a temporary file when `spill`
+    is set.  Spilled entries are read back through a memory map when the engine rewinds that far
+    """
+    limit: Optional[int] = None
+    spill: bool = False
+    entries: Deque[context_diff] = field(default_factory=deque, repr=False)
+    spilled: List[Tuple[int, int]] = field(default_factory=list, repr=False)
+    spill_file: Optional[BinaryIO] = field(default=None, repr=False)
+
+    @staticmethod
+    def from_entries(entries: Iterable[context_diff], limit: Optional[int] = None, spill: bool = False) -> 'History':
+        """
+        creates a history from its entries, newest first
+        """
+        return History(limit, spill, deque(reversed(tuple(entries))))
+
+    def push(self, diff: context_diff):
+        self.entries.append(diff)
+        if self.limit is not None and len(self.entries) > self.limit:
+            oldest = self.entries.popleft()
+            if self.spill:
+                self.spill_entry(oldest)
+
+    def pop(self) -> context_diff:
+        if self.entries:
+            return self.entries.pop()
+        start, end = self.spilled.pop()
+        return self.read_spilled(start, end)
+
+    def spill_entry(self, diff: context_diff):
+        if self.spill_file is None:
+            self.spill_file = tempfile.TemporaryFile()
+        content = pickle.dumps(diff, protocol=pickle.HIGHEST_PROTOCOL)
+        start = self.spill_file.seek(0, 2)
+        self.spill_file.write(content)
+        self.spill_file.flush()
+        # entries are spilled oldest first, so the newest spilled entry is last
+        self.spilled.append((start, start + len(content)))
+
+    def read_spilled(self, start: int, end: int) -> context_diff:
+        with mmap.mmap(self.spill_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return pickle.loads(mapped[start:end])
+
+    def __len__(self) -> int:
+        return len(self.entries) + len(self.spilled)
+
+    def __iter__(self) -> Iterator[context_diff]:
+        yield from reversed(self.entries)
+        for start, end in reversed(self.spilled):
+            yield self.read_spilled(start, end)
+
+    def __getitem__(self, index: int) -> context_diff:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('history index out of range')
+        if index < len(self.entries):
+            return self.entries[-1 - index]
+        start, end = self.spilled[-1 - (index - len(self.entries))]
+        return self.read_spilled(start, end)
+
+    def __eq__(self, other):
+        match other:
+            case History() | tuple():
+                return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __copy__(self) -> 'History':
+        # spilled entries are only ever appended to the file, so copies can share it
+        return History(self.limit, self.spill, copy(self.entries), list(self.spilled), self.spill_file)
+
+    def __reduce__(self):
+        return History.from_entries, (tuple(self), self.limit, self.spill)
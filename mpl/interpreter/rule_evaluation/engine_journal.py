@@ -0,0 +1,195 @@
+import os
+import pickle
+import struct
+from dataclasses import dataclass, field
+from typing import Any, List, Tuple, Optional, BinaryIO, Iterable
+
+from mpl.interpreter.rule_evaluation.engine_snapshot import save_snapshot, load_snapshot
+from mpl.interpreter.rule_evaluation.mpl_engine import MPLEngine
+
+"""
+A journal is a directory holding an append-only log of the changes made to an engine, and checkpoints, which are
+snapshots of the engine named after the last record they include.  Each record in the log is a length prefixed pickle
+of its sequence number, its kind and its payload:
+
+update      the changes a tick applied to the context
+history     a diff that was added to the history of the engine
+rewind      a number of ticks that were undone
+activate    a reference and the value it was activated with
+deactivate  a deactivated reference
+add         added rule expressions
+remove      removed rule expressions
+merge       a context merged into the context of the engine, and whether its values replaced the existing ones
+
+Swapping the context or the rules of an engine outright checkpoints it instead of writing a record.  An engine is
+recovered by loading the latest checkpoint and replaying the records that came after it.  A record that was only partly
+written when the process died ends the log
+"""
+
+journal_file_name = 'journal.log'
+checkpoint_prefix = 'checkpoint-'
+checkpoint_suffix = '.mpls'
+record_header = struct.Struct('>I')
+
+journal_record = Tuple[int, str, Any]
+
+
+def checkpoint_name(sequence: int) -> str:
+    return f'{checkpoint_prefix}{sequence:012d}{checkpoint_suffix}'
+
+
+def list_checkpoints(path: str) -> List[Tuple[int, str]]:
+    result = []
+    for name in os.listdir(path):
+        if name.startswith(checkpoint_prefix) and name.endswith(checkpoint_suffix):
+            sequence = name[len(checkpoint_prefix):-len(checkpoint_suffix)]
+            if sequence.isdigit():
+                result.append((int(sequence), os.path.join(path, name)))
+    return sorted(result)
+
+
+def read_journal(path: str) -> Tuple[List[journal_record], int]:
+    """
+    reads the records in a journal file, returns them along with the length of the file they cover
+    """
+    if not os.path.exists(path):
+        return [], 0
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    records = []
+    position = 0
+    while position + record_header.size <= len(data):
+        length, = record_header.unpack_from(data, position)
+        end = position + record_header.size + length
+        if end > len(data):
+            break
+        try:
+            records.append(pickle.loads(data[position + record_header.size:end]))
+        except Exception:
+            break
+        position = end
+    return records, position
+
+
+@dataclass
+class EngineJournal:
+    """
+    Collects the changes made to an engine and appends them to the journal in batches of `batch_size` records.
+    Every `checkpoint_interval` records, the engine is checkpointed and the log starts over
+    """
+    path: str
+    batch_size: int = 64
+    checkpoint_interval: int = 4096
+    sync: bool = False
+    sequence: int = 0
+    since_checkpoint: int = 0
+    pending: List[journal_record] = field(default_factory=list)
+    file: Optional[BinaryIO] = field(default=None, repr=False)
+
+    @staticmethod
+    def open(path: str, **options) -> 'EngineJournal':
+        """
+        opens the journal in the provided directory, continuing after its last complete record
+        """
+        os.makedirs(path, exist_ok=True)
+        journal_path = os.path.join(path, journal_file_name)
+        records, valid_length = read_journal(journal_path)
+        checkpoints = list_checkpoints(path)
+
+        sequence = max([records[-1][0] if records else 0] + [x[0] for x in checkpoints])
+        result = EngineJournal(path, sequence=sequence, since_checkpoint=len(records), **options)
+        result.file = open(journal_path, 'ab')
+        # anything after the last complete record is a torn write
+        result.file.truncate(valid_length)
+        return result
+
+    def record(self, kind: str, payload: Any):
+        self.sequence += 1
+        self.since_checkpoint += 1
+        self.pending.append((self.sequence, kind, payload))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        chunks = []
+        for item in self.pending:
+            content = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+            chunks.append(record_header.pack(len(content)))
+            chunks.append(content)
+        self.file.write(b''.join(chunks))
+        self.file.flush()
+        if self.sync:
+            os.fsync(self.file.fileno())
+        self.pending = []
+
+    @property
+    def checkpoint_due(self) -> bool:
+        return self.since_checkpoint >= self.checkpoint_interval
+
+    def checkpoint(self, engine: MPLEngine):
+        """
+        saves the engine as of the last record, then drops the records and checkpoints that it covers
+        """
+        self.flush()
+        target = os.path.join(self.path, checkpoint_name(self.sequence))
+        temporary = target + '.tmp'
+        save_snapshot(engine, temporary)
+        os.replace(temporary, target)
+
+        self.file.truncate(0)
+        self.file.flush()
+        self.since_checkpoint = 0
+        for sequence, checkpoint_path in list_checkpoints(self.path):
+            if sequence < self.sequence:
+                os.remove(checkpoint_path)
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+def replay(engine: MPLEngine, records: Iterable[journal_record]) -> MPLEngine:
+    journal, engine.journal = engine.journal, None
+    for _, kind, payload in records:
+        match kind:
+            case 'update':
+                context, changes = engine.context.update(payload)
+                engine.apply_context(context, changes)
+            case 'history':
+                engine.history.push(payload)
+            case 'rewind':
+                engine.tick(-payload)
+            case 'activate':
+                engine.activate(*payload)
+            case 'deactivate':
+                engine.deactivate(payload)
+            case 'add':
+                engine.add(payload)
+            case 'remove':
+                engine.remove(payload)
+            case 'merge':
+                engine.merge_context(*payload)
+    engine.journal = journal
+    return engine
+
+
+def recover(path: str, **options) -> MPLEngine:
+    """
+    rebuilds an engine from the latest checkpoint in a journal and the records written after it, then resumes
+    journaling its changes
+    """
+    journal = EngineJournal.open(path, **options)
+    checkpoints = list_checkpoints(path)
+    checkpoint_sequence = 0
+    engine = MPLEngine()
+    if checkpoints:
+        checkpoint_sequence, checkpoint_path = checkpoints[-1]
+        engine = load_snapshot(checkpoint_path)
+
+    records, _ = read_journal(os.path.join(path, journal_file_name))
+    replay(engine, [x for x in records if x[0] > checkpoint_sequence])
+    engine.journal = journal
+    return engine
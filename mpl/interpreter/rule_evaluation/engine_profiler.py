@@ -0,0 +1,182 @@
+import json
+from collections import deque, defaultdict
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Dict, Optional, Deque, Callable, Any, Iterable
+
+from mpl.interpreter.expression_evaluation.engine_context import EngineContext
+from mpl.interpreter.rule_evaluation import RuleInterpreter, RuleInterpretation, RuleInterpretationState
+
+"""
+The phases of a tick that are timed:
+
+interpret                   interpreting the rules that were due, the time of each rule is also kept on its own
+identify_conflicts          finding the conflicts between the applicable interpretations
+resolve_conflict_map        choosing which interpretations are accepted
+get_invalidated_triggers    finding the triggers that weren't refreshed
+update                      applying the changes to the context
+"""
+
+
+def call(phase: str, function: Callable, *args) -> Any:
+    """
+    runs the function without timing it, the stand in for `TickProfiler.measure` when an engine isn't profiled
+    """
+    return function(*args)
+
+
+def rule_name(interpreter: RuleInterpreter) -> str:
+    return interpreter.name or str(interpreter.expression)
+
+
+@dataclass
+class TickStats:
+    phases: Dict[str, float] = field(default_factory=dict)
+    rules: Dict[str, float] = field(default_factory=dict)
+    applicable: int = 0
+    not_applicable: int = 0
+
+    @property
+    def duration(self) -> float:
+        return sum(self.phases.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'duration': self.duration,
+            'phases': dict(self.phases),
+            'rules': dict(self.rules),
+            'applicable': self.applicable,
+            'not_applicable': self.not_applicable,
+        }
+
+
+@dataclass
+class TickProfiler:
+    """
+    Times the phases of each tick of an engine and the interpretation of each of its rules.  The stats of the last
+    `limit` ticks are kept, and the totals cover every tick since the profiler started
+    """
+    limit: Optional[int] = 1024
+    ticks: Deque[TickStats] = field(default_factory=deque, repr=False)
+    current: Optional[TickStats] = field(default=None, repr=False)
+    tick_count: int = 0
+    phase_totals: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    rule_totals: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    rule_calls: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    applicable: int = 0
+    not_applicable: int = 0
+
+    def __post_init__(self):
+        self.ticks = deque(self.ticks, maxlen=self.limit)
+
+    def start_tick(self) -> TickStats:
+        self.current = TickStats()
+        return self.current
+
+    def finish_tick(self):
+        stats, self.current = self.current, None
+        if stats is None:
+            return
+        self.ticks.append(stats)
+        self.tick_count += 1
+        for phase, duration in stats.phases.items():
+            self.phase_totals[phase] += duration
+        for name, duration in stats.rules.items():
+            self.rule_totals[name] += duration
+            self.rule_calls[name] += 1
+        self.applicable += stats.applicable
+        self.not_applicable += stats.not_applicable
+
+    def measure(self, phase: str, function: Callable, *args) -> Any:
+        start = perf_counter()
+        result = function(*args)
+        phases = self.current.phases
+        phases[phase] = phases.get(phase, 0.0) + perf_counter() - start
+        return result
+
+    def interpret(self, interpreters: Iterable[RuleInterpreter], context: EngineContext) \
+            -> Dict[RuleInterpreter, RuleInterpretation]:
+        """
+        interprets each of the rules, timing them one by one
+        """
+        stats = self.current
+        result = {}
+        phase_start = perf_counter()
+        for interpreter in interpreters:
+            start = perf_counter()
+            interpretation = interpreter.interpret(context)
+            name = rule_name(interpreter)
+            stats.rules[name] = stats.rules.get(name, 0.0) + perf_counter() - start
+            result[interpreter] = interpretation
+        stats.phases['interpret'] = stats.phases.get('interpret', 0.0) + perf_counter() - phase_start
+        self.count(result.values())
+        return result
+
+    def count(self, interpretations: Iterable[RuleInterpretation]):
+        stats = self.current
+        for interpretation in interpretations:
+            match interpretation.state:
+                case RuleInterpretationState.APPLICABLE:
+                    stats.applicable += 1
+                case RuleInterpretationState.NOT_APPLICABLE:
+                    stats.not_applicable += 1
+
+    def reset(self):
+        self.ticks.clear()
+        self.current = None
+        self.tick_count = 0
+        self.phase_totals.clear()
+        self.rule_totals.clear()
+        self.rule_calls.clear()
+        self.applicable = 0
+        self.not_applicable = 0
+
+    def summary(self) -> Dict[str, Any]:
+        rules = {
+            name: {
+                'calls': self.rule_calls[name],
+                'total': total,
+                'mean': total / self.rule_calls[name],
+            }
+            for name, total in sorted(self.rule_totals.items(), key=lambda x: x[1], reverse=True)
+        }
+        return {
+            'ticks': self.tick_count,
+            'duration': sum(self.phase_totals.values()),
+            'phases': dict(self.phase_totals),
+            'rules': rules,
+            'applicable': self.applicable,
+            'not_applicable': self.not_applicable,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.summary() | {'recent': [x.to_dict() for x in self.ticks]}
+
+    def to_json(self, **options) -> str:
+        return json.dumps(self.to_dict(), **options)
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            f.write(self.to_json(indent=2))
+
+    def report(self, top: int = 10) -> str:
+        """
+        a readable summary of the time spent in each phase, and in the `top` slowest rules
+        """
+        summary = self.summary()
+        lines = [
+            f'ticks: {summary["ticks"]}  total: {format_seconds(summary["duration"])}  '
+            f'applicable: {summary["applicable"]}  not applicable: {summary["not_applicable"]}'
+        ]
+        lines.extend(f'{phase:<26}{format_seconds(duration)}' for phase, duration in summary['phases'].items())
+        if summary['rules']:
+            lines.append('slowest rules:')
+        for name, stats in list(summary['rules'].items())[:top]:
+            lines.append(f'{format_seconds(stats["total"]):>12} {stats["calls"]:>8} calls  {name}')
+        return '\n'.join(lines)
+
+
+def format_seconds(seconds: float) -> str:
+    if seconds >= 1:
+        return f'{seconds:.3f}s'
+    return f'{seconds * 1000:.3f}ms'
@@ -0,0 +1,112 @@
+import difflib
+from dataclasses import dataclass, field
+from typing import Tuple, Any, Optional, Dict, FrozenSet
+
+from mpl.Parser.ExpressionParsers.machine_expression_parser import MachineFile, split_machine_text, parse_line, \
+    parse_context
+from mpl.Parser.ExpressionParsers.reference_expression_parser import ReferenceExpression
+from mpl.Parser.ExpressionParsers.rule_expression_parser import RuleExpression
+from mpl.interpreter.reference_resolution.mpl_ontology import assign_parentage_from_machine_file, \
+    rule_expressions_from_graph
+from mpl.lib.parsers.packrat import packrat
+from mpl.lib.parsers.repsep2 import SeparatedList
+from mpl.interpreter.rule_evaluation.mpl_engine import MPLEngine
+
+"""
+Reloads a machine file into a running engine.  The loader keeps the text and the parsed value of every line of the
+file, when the file changes the new lines are diffed against the old ones and only the lines that changed are parsed
+again.  A line parses the same wherever it is, its depth is the column it starts at, so the lines around an edit can
+keep their values.  Which machine a line belongs to does depend on the lines above it, so the parsed lines are qualified
+again as a whole, which is cheap next to parsing them, and the rules and declarations that changed are applied to the
+engine.
+
+The engine keeps its context: references that are no longer declared keep their values, and the context section of the
+file only applies to engines built from it
+"""
+
+
+@dataclass(frozen=True)
+class ReloadResult:
+    added: FrozenSet[RuleExpression | ReferenceExpression] = frozenset()
+    removed: FrozenSet[RuleExpression | ReferenceExpression] = frozenset()
+    parsed: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed)
+
+
+@dataclass
+class MachineFileLoader:
+    lines: Tuple[str, ...] = ()
+    values: Tuple[Any, ...] = ()
+    context_text: str = ''
+    context: Optional[Dict[ReferenceExpression, FrozenSet]] = None
+    expressions: FrozenSet[RuleExpression | ReferenceExpression] = field(default_factory=frozenset, repr=False)
+
+    @staticmethod
+    def from_text(text: str) -> 'MachineFileLoader':
+        result = MachineFileLoader()
+        result.update(text)
+        return result
+
+    @property
+    def machine_file(self) -> MachineFile:
+        return MachineFile(SeparatedList(self.values), self.context)
+
+    def update(self, text: str) -> ReloadResult:
+        """
+        parses the lines that differ from the last text the loader saw, a line that can't be parsed raises a
+        ValueError and leaves the loader as it was
+        """
+        lines, context_text = split_machine_text(text)
+        values = []
+        parsed = 0
+        matcher = difflib.SequenceMatcher(None, self.lines, lines, autojunk=False)
+        with packrat():
+            for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+                if tag == 'equal':
+                    values.extend(self.values[old_start:old_end])
+                    continue
+                for number in range(new_start, new_end):
+                    values.append(parse_line(lines[number], number))
+                parsed += new_end - new_start
+
+        context = self.context if context_text == self.context_text else parse_context(context_text)
+
+        self.lines, self.values = tuple(lines), tuple(values)
+        self.context_text, self.context = context_text, context
+
+        previous = self.expressions
+        self.expressions = assign_parentage_from_machine_file(self.machine_file)
+        return ReloadResult(self.expressions - previous, previous - self.expressions, parsed)
+
+
+def load_reloadable(path: str) -> MPLEngine:
+    """
+    builds an engine from a machine file, keeping the loader so the engine can be reloaded when the file changes
+    """
+    with open(path, 'r') as f:
+        loader = MachineFileLoader.from_text(f.read())
+    engine = MPLEngine.from_file(loader.machine_file)
+    engine.loader = loader
+    return engine
+
+
+def reload_engine(engine: MPLEngine, text: str) -> ReloadResult:
+    """
+    applies the rules and declarations that changed in the text of the machine to the engine.  An engine that wasn't
+    loaded with a loader is compared to the rules it runs
+    """
+    loader = engine.loader
+    if loader is None:
+        loader = MachineFileLoader(expressions=rule_expressions_from_graph(engine.ontology))
+    result = loader.update(text)
+    engine.loader = loader
+
+    removed_rules = {x for x in result.removed if isinstance(x, RuleExpression)}
+    if removed_rules:
+        engine.remove(removed_rules)
+    if result.added:
+        engine.add(result.added)
+    return result
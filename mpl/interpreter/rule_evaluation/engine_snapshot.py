@@ -0,0 +1,72 @@
+import pickle
+import struct
+import zlib
+from random import Random
+
+from mpl.interpreter.reference_resolution.mpl_ontology import OntologyIndex
+from mpl.interpreter.rule_evaluation.mpl_engine import MPLEngine
+
+"""
+A snapshot is the magic number, the version of the format as an unsigned short, and a zlib compressed pickle of the
+rule interpreters, the graph, the context, the history and the random number generator of an engine.  Interpreters
+keep their symbolized stacks, so loading a snapshot doesn't parse anything.  Snapshots are pickles, only load the ones
+you trust
+"""
+
+snapshot_magic = b'MPLS'
+snapshot_version = 1
+snapshot_header = struct.Struct('>4sH')
+snapshot_keys = {'rules', 'graph', 'context', 'history'}
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def dump_engine(engine: MPLEngine) -> bytes:
+    content = {
+        'rules': tuple(engine.rule_interpreters),
+        'graph': engine.graph,
+        'context': engine.context,
+        'history': engine.history,
+        'rng': engine.rng,
+    }
+    payload = zlib.compress(pickle.dumps(content, protocol=pickle.HIGHEST_PROTOCOL))
+    return snapshot_header.pack(snapshot_magic, snapshot_version) + payload
+
+
+def load_engine(data: bytes) -> MPLEngine:
+    if len(data) < snapshot_header.size:
+        raise SnapshotError('not an MPL snapshot')
+    magic, version = snapshot_header.unpack_from(data)
+    if magic != snapshot_magic:
+        raise SnapshotError('not an MPL snapshot')
+    if version != snapshot_version:
+        raise SnapshotError(f'unsupported snapshot version {version}, expected {snapshot_version}')
+
+    try:
+        content = pickle.loads(zlib.decompress(data[snapshot_header.size:]))
+    except Exception as e:
+        # a damaged pickle can fail in many ways, from missing modules to bad arguments
+        raise SnapshotError('corrupt MPL snapshot') from e
+    if not isinstance(content, dict) or not snapshot_keys <= content.keys():
+        raise SnapshotError('corrupt MPL snapshot, it is missing the state of the engine')
+    graph = content['graph']
+    return MPLEngine(
+        set(content['rules']),
+        content['context'],
+        content['history'],
+        graph,
+        ontology_index=OntologyIndex.from_graph(graph),
+        rng=content.get('rng') or Random(),
+    )
+
+
+def save_snapshot(engine: MPLEngine, path: str):
+    with open(path, 'wb') as f:
+        f.write(dump_engine(engine))
+
+
+def load_snapshot(path: str) -> MPLEngine:
+    with open(path, 'rb') as f:
+        return load_engine(f.read())
@@ -1,31 +1,53 @@
-from dataclasses import dataclass
-from random import random, randint
-from typing import Set, Dict, Tuple, Any, Iterable, FrozenSet, Optional
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+from dataclasses import dataclass, field
+from functools import partial
+from math import ceil
+from random import Random
+from typing import Set, Dict, Tuple, Any, Iterable, FrozenSet, Optional, Callable
 
 from networkx import MultiDiGraph
 
 from mpl.Parser.ExpressionParsers.machine_expression_parser import MachineFile
-from mpl.Parser.ExpressionParsers.reference_expression_parser import Reference
+from mpl.Parser.ExpressionParsers.reference_expression_parser import Reference, ReferenceExpression
 from mpl.Parser.ExpressionParsers.rule_expression_parser import RuleExpression, RuleExpressionParsers
 from mpl.interpreter.conflict_resolution import identify_conflicts, compress_interpretations, \
-    resolve_conflict_map
+    resolve_conflict_map, normalize_tracker
 from mpl.interpreter.expression_evaluation.engine_context import EngineContext, context_diff
-from mpl.interpreter.expression_evaluation.entity_value import false_value
+from mpl.interpreter.expression_evaluation.entity_value import false_value, EntityValue
 
 from mpl.interpreter.reference_resolution.mpl_ontology import process_machine_file, rule_expressions_from_graph, \
-    construct_graph_from_expressions, Relationship
+    construct_graph_from_expressions, OntologyIndex
 from mpl.interpreter.rule_evaluation import RuleInterpreter, RuleInterpretationState, RuleInterpretation, \
     create_rule_interpreter
+from mpl.interpreter.rule_evaluation.engine_change_log import ChangeLog
+from mpl.interpreter.rule_evaluation.engine_history import History
+from mpl.interpreter.rule_evaluation.engine_profiler import call
+from mpl.interpreter.rule_evaluation.rule_scheduling import RuleScheduler
 from mpl.lib import fs
-from mpl.lib.graph_operations import combine_graphs, drop_from_graph
+from mpl.lib.graph_operations import merge_into_graph, remove_from_graph
+
+exploration_outcome = FrozenSet[Tuple[Reference, EntityValue]]
 
 
 @dataclass(order=True)
 class MPLEngine:
     rule_interpreters: Set[RuleInterpreter] = frozenset()
     context: EngineContext = EngineContext()
-    history: Tuple[context_diff, ...] = ()
-    graph: Optional[MultiDiGraph] = MultiDiGraph()
+    history: History = field(default_factory=History)
+    graph: Optional[MultiDiGraph] = field(default_factory=MultiDiGraph)
+    scheduler: RuleScheduler = field(default_factory=RuleScheduler, compare=False, repr=False)
+    ontology_index: OntologyIndex = field(default_factory=OntologyIndex, compare=False, repr=False)
+    journal: Optional['EngineJournal'] = field(default=None, compare=False, repr=False)
+    rng: Random = field(default_factory=Random, compare=False, repr=False)
+    profiler: Optional['TickProfiler'] = field(default=None, compare=False, repr=False)
+    loader: Optional['MachineFileLoader'] = field(default=None, compare=False, repr=False)
+
+    def __post_init__(self):
+        if not isinstance(self.history, History):
+            self.history = History.from_entries(self.history)
 
     @staticmethod
     def from_file(file: str | MachineFile) -> 'MPLEngine':
@@ -35,31 +57,127 @@ class MPLEngine:
         context, graph = process_machine_file(file)
         rule_expressions = rule_expressions_from_graph(graph)
         interpreters = {RuleInterpreter.from_expression(rule) for rule in rule_expressions}
-        return MPLEngine(interpreters, context, (), graph)
+        return MPLEngine(interpreters, context, (), graph, ontology_index=OntologyIndex.from_graph(graph))
+
+    @staticmethod
+    def from_snapshot(path: str) -> 'MPLEngine':
+        from mpl.interpreter.rule_evaluation.engine_snapshot import load_snapshot
+        return load_snapshot(path)
+
+    def save_snapshot(self, path: str):
+        from mpl.interpreter.rule_evaluation.engine_snapshot import save_snapshot
+        save_snapshot(self, path)
 
-    def add(self, rules: RuleExpression | Set[RuleExpression]) -> 'MPLEngine':
+    @staticmethod
+    def recover(path: str, **options) -> 'MPLEngine':
+        from mpl.interpreter.rule_evaluation.engine_journal import recover
+        return recover(path, **options)
+
+    def start_journal(self, path: str, **options) -> 'EngineJournal':
+        """
+        journals the changes made to this engine in the provided directory, starting from a checkpoint of its current
+        state
+        """
+        from mpl.interpreter.rule_evaluation.engine_journal import EngineJournal
+        self.journal = EngineJournal.open(path, **options)
+        self.journal.checkpoint(self)
+        return self.journal
+
+    def start_profiling(self, **options) -> 'TickProfiler':
+        """
+        times each tick of the engine from now on, see `TickProfiler`
+        """
+        from mpl.interpreter.rule_evaluation.engine_profiler import TickProfiler
+        self.profiler = TickProfiler(**options)
+        return self.profiler
+
+    def stop_profiling(self) -> Optional['TickProfiler']:
+        profiler, self.profiler = self.profiler, None
+        return profiler
+
+    def reload(self, path: str) -> 'ReloadResult':
+        """
+        applies the changes made to a machine file to this engine without resetting its context, only the lines that
+        changed since the last reload are parsed, see `MachineFileLoader`
+        """
+        from mpl.interpreter.rule_evaluation.engine_reload import reload_engine
+        with open(path, 'r') as f:
+            return reload_engine(self, f.read())
+
+    def record(self, kind: str, payload: Any):
+        if self.journal is not None:
+            self.journal.record(kind, payload)
+
+    def add(self, rules: RuleExpression | ReferenceExpression | Set[RuleExpression | ReferenceExpression]) \
+            -> 'MPLEngine':
         if not isinstance(rules, Iterable):
             rules = {rules}
+        rules = frozenset(rules)
+        self.record('add', rules)
 
         new_graph = construct_graph_from_expressions(rules)
-        self.graph = combine_graphs(self.graph, new_graph)
-        new_context = EngineContext.from_graph(self.graph)
-        self.context, changes = new_context.update(self.context)
-
-        self.rule_interpreters = {RuleInterpreter.from_expression(rule) for rule in rules} | self.rule_interpreters
+        ontology = self.editable_ontology()
+        merge_into_graph(self.graph, new_graph)
+        ontology.add_graph(new_graph)
+        new_references = {x for x in new_graph.nodes if isinstance(x, Reference)}
+        context, changes = self.context.add_references(ontology.typed(new_references))
+        self.apply_context(context, changes)
+
+        new_interpreters = {RuleInterpreter.from_expression(rule) for rule in rules if isinstance(rule, RuleExpression)}
+        self.scheduler.sync_rules(self.rule_interpreters)
+        self.rule_interpreters = new_interpreters | self.rule_interpreters
+        self.scheduler.add(new_interpreters, self.rule_interpreters)
         return self
 
     def remove(self, rules: RuleExpression | Set[RuleExpression]) -> 'MPLEngine':
         if not isinstance(rules, Iterable):
             rules = {rules}
+        rules = frozenset(rules)
+        self.record('remove', rules)
 
+        self.scheduler.sync_rules(self.rule_interpreters)
+        removed = {interpreter for interpreter in self.rule_interpreters if interpreter.expression in rules}
         self.rule_interpreters = \
             {interpreter for interpreter in self.rule_interpreters if interpreter.expression not in rules}
-        expressions = {interpreter.expression for interpreter in self.rule_interpreters}
-        self.graph = drop_from_graph(expressions, self.graph)
+        self.scheduler.remove(removed, self.rule_interpreters)
+        expressions = {interpreter.expression for interpreter in removed}
+        ontology = self.editable_ontology()
+        remove_from_graph(expressions, self.graph)
+        ontology.remove_nodes(expressions)
+
+        return self
 
+    def merge_context(self, context: EngineContext, replace: bool = True) -> 'MPLEngine':
+        """
+        merges a context into the context of the engine.  Its values replace the ones the engine has, unless `replace`
+        is off, then only the references the engine doesn't have yet are added
+        """
+        self.record('merge', (context, replace))
+        self.context = self.context | context if replace else context | self.context
         return self
 
+    def replace_context(self, context: EngineContext) -> 'MPLEngine':
+        """
+        swaps the context of the engine for another one, a journaled engine is checkpointed since the journal can't
+        describe the swap
+        """
+        self.context = context
+        self.checkpoint_journal()
+        return self
+
+    def replace_rules(self, rules: Set[RuleInterpreter], graph: MultiDiGraph) -> 'MPLEngine':
+        """
+        swaps the rules and graph of the engine for other ones, checkpointing a journaled engine like `replace_context`
+        """
+        self.rule_interpreters = rules
+        self.graph = graph
+        self.checkpoint_journal()
+        return self
+
+    def checkpoint_journal(self):
+        if self.journal is not None:
+            self.journal.checkpoint(self)
+
     def execute_expression(self, expression: RuleExpression) -> Dict[Reference, context_diff]:
         interpreter = RuleInterpreter.from_expression(expression)
         new_context = EngineContext.from_references(interpreter.references)
@@ -71,11 +189,12 @@ class MPLEngine:
         if result.state != RuleInterpretationState.APPLICABLE:
             return dict()
         conflicts = identify_conflicts(fs(result))
-        resolved = resolve_conflict_map(conflicts)
+        resolved = resolve_conflict_map(conflicts, self.rng)
         resolved_changes = compress_interpretations(resolved)
         context, changes = context.update(resolved_changes)
         all_changes |= changes
-        self.history = (all_changes,) + self.history
+        self.history.push(all_changes)
+        self.record('history', all_changes)
         return all_changes
 
     def get_invalidated_triggers(self, interpretations: FrozenSet[RuleInterpretation]) -> \
@@ -94,39 +213,103 @@ class MPLEngine:
         return result
 
 
-    def execute_interpreters(self, interpreters: FrozenSet[RuleInterpreter], seed=1) -> context_diff:
+    def apply_context(self, context: EngineContext, changes: context_diff) -> context_diff:
+        """
+        replaces the context of the engine, keeping the rule schedule informed of the changes
+        """
+        if self.scheduler.context is self.context:
+            self.scheduler.changed(changes)
+            self.scheduler.context = context
+        self.context = context
+        return changes
 
-        interpretations = {interpreter.interpret(self.context) for interpreter in interpreters}
-        applicable = frozenset({x for x in interpretations if x.state == RuleInterpretationState.APPLICABLE})
+    def execute_interpreters(self, interpreters: FrozenSet[RuleInterpreter]) -> context_diff:
+        profiler = self.profiler
+        if profiler is None:
+            return self.resolve_interpreters(interpreters, call)
+        profiler.start_tick()
+        try:
+            return self.resolve_interpreters(interpreters, profiler.measure, profiler)
+        finally:
+            profiler.finish_tick()
+
+    def resolve_interpreters(self, interpreters: FrozenSet[RuleInterpreter], measure: Callable,
+                             profiler: Optional['TickProfiler'] = None) -> context_diff:
+        if profiler is None:
+            interpretations = {interpreter: interpreter.interpret(self.context) for interpreter in interpreters}
+        else:
+            interpretations = profiler.interpret(interpreters, self.context)
+        self.scheduler.record(interpretations)
+        applicable = frozenset(
+            {x for x in interpretations.values() if x.state == RuleInterpretationState.APPLICABLE}
+        )
         if not applicable:
             return dict()
         # trigger_nullifiers = get_trigger_nullifiers(self)
-        conflicts = identify_conflicts(applicable)
-        resolved = resolve_conflict_map(conflicts)
-        invalidated_triggers = self.get_invalidated_triggers(resolved)
+        conflicts = measure('identify_conflicts', identify_conflicts, applicable)
+        resolved = measure('resolve_conflict_map', resolve_conflict_map, conflicts, self.rng)
+        invalidated_triggers = measure('get_invalidated_triggers', self.get_invalidated_triggers, resolved)
         resolved_changes = compress_interpretations(resolved)
         all_changes = resolved_changes | invalidated_triggers
-        self.context, changes = self.context.update(all_changes)
-        return changes
+        self.record('update', all_changes)
+        context, changes = measure('update', self.context.update, all_changes)
+        return self.apply_context(context, changes)
 
     def tick(self, count: int = 1) -> context_diff:
         output = dict()
         if count > 0:
             #  tick forward
             for tick in range(count):
-                seed = randint(0, 1000)
-                output |= self.execute_interpreters(frozenset(self.rule_interpreters), seed=seed)
-            self.history = (output,) + self.history
+                self.scheduler.sync(self.rule_interpreters, self.context)
+                output |= self.execute_interpreters(self.scheduler.due)
+            self.history.push(output)
+            self.record('history', output)
         elif count < 0:
-            # tick backward
-            for tick in range(abs(count)):
-                this_tick = self.history[0]
-                self.history = self.history[1:]
+            # tick backward, as far as the history goes
+            count = min(abs(count), len(self.history))
+            self.record('rewind', count)
+            for tick in range(count):
+                this_tick = self.history.pop()
                 resolved = MPLEngine.invert_diff(this_tick)
                 resolved_changes = compress_interpretations(resolved)
-                self.context, output = self.context.update(resolved_changes)
+                context, changes = self.context.update(resolved_changes)
+                output |= self.apply_context(context, changes)
+        if self.journal is not None and self.journal.checkpoint_due:
+            self.journal.checkpoint(self)
         return output
 
+    def run(self, count: int, seed: Optional[int] = None) -> ChangeLog:
+        """
+        runs `count` ticks, seeding the random number generator of the engine first when a seed is provided, and returns
+        the changes made on each of them.  Unlike `tick(count)`, every tick gets its own entry in the history
+        """
+        if seed is not None:
+            self.seed(seed)
+        result = ChangeLog()
+        scheduler = self.scheduler
+        for tick in range(count):
+            scheduler.sync(self.rule_interpreters, self.context)
+            changes = self.execute_interpreters(scheduler.due)
+            self.history.push(changes)
+            self.record('history', changes)
+            result.extend(tick, changes)
+            if self.journal is not None and self.journal.checkpoint_due:
+                self.journal.checkpoint(self)
+        return result
+
+    def seed(self, value: Any):
+        self.rng.seed(value)
+
+    def fork(self, seed: Optional[Any] = None) -> 'MPLEngine':
+        """
+        a copy of the engine with an independent random number generator, seeded from the generator of this engine
+        unless a seed is provided.  Forks start with an empty history that keeps the limit of this one, they run from
+        the current state and don't need the ticks that led to it
+        """
+        result = self.copy_with_history(History(self.history.limit, self.history.spill))
+        result.rng = Random(self.rng.getrandbits(64) if seed is None else seed)
+        return result
+
     @staticmethod
     def invert_diff(diff: context_diff) -> FrozenSet[RuleInterpretation]:
         from mpl.interpreter.expression_evaluation.entity_value import EntityValue
@@ -142,26 +325,88 @@ class MPLEngine:
         return fs(interpretation)
 
     def activate(self, ref: Reference | Set[Reference],  value: Any = None) -> context_diff:
-        self.context, changes = self.context.activate(ref, value)
-        return changes
+        self.record('activate', (ref, value))
+        context, changes = self.context.activate(ref, value)
+        return self.apply_context(context, changes)
 
     def deactivate(self, ref: Reference | Set[Reference]) -> context_diff:
-        self.context, changes = self.context.deactivate(ref)
-        return changes
+        self.record('deactivate', ref)
+        context, changes = self.context.deactivate(ref)
+        return self.apply_context(context, changes)
 
     def query(self, ref: Reference) -> 'EntityValue':
         value = self.context[ref]
         return value
 
+    @property
+    def ontology(self) -> OntologyIndex:
+        """
+        the index of the relationships in the graph of the engine, rebuilt if the graph was replaced directly
+        """
+        if self.ontology_index.graph is not self.graph:
+            self.ontology_index = OntologyIndex.from_graph(self.graph)
+        return self.ontology_index
+
+    def editable_ontology(self) -> OntologyIndex:
+        """
+        the index of the graph of the engine, after making sure that neither of them is shared with another engine,
+        so they can be changed in place
+        """
+        ontology = self.ontology
+        if ontology.shared:
+            self.graph = self.graph.copy()
+            ontology = copy(ontology)
+            ontology.graph = self.graph
+            self.ontology_index = ontology
+        return ontology
+
     def get_types(self, ref: Reference) -> FrozenSet[str]:
-        tmp = self.graph.out_edges(ref.without_types, data='relationship')
-        result = {ref_type for ref, ref_type, edge in tmp if edge == Relationship.IS_A}
-        return frozenset(result)
+        return self.ontology.types(ref.without_types)
 
     @property
     def active(self) -> Dict[Reference, 'EntityValue']:
         return self.context.active
 
+    def explore(self, trials: int, ticks: int = 1, workers: Optional[int] = None, seed: int = 0) \
+            -> Dict[exploration_outcome, float]:
+        """
+        runs independent trajectories of `ticks` ticks from the current state of the engine, each on a fork seeded
+        with `seed + n` for trial n, and returns how often each set of active references was reached.  The trials are
+        spread over a pool of `workers` processes, one per core by default
+        """
+        workers = workers or os.cpu_count() or 1
+        chunk_size = max(1, ceil(trials / (workers * 4)))
+        chunks = [range(seed + start, seed + min(start + chunk_size, trials)) for start in range(0, trials, chunk_size)]
+
+        if workers == 1:
+            results = [explore_trajectories(chunk, ticks, self) for chunk in chunks]
+        else:
+            # the workers only need the current state, so they get a fork without the history
+            with ProcessPoolExecutor(workers, initializer=start_exploration, initargs=(self.fork(seed),)) as executor:
+                results = list(executor.map(partial(explore_trajectories, ticks=ticks), chunks))
+
+        tracker = defaultdict(lambda: 0)
+        for result in results:
+            for outcome, count in result.items():
+                tracker[outcome] += count
+                tracker['total'] += count
+        return normalize_tracker(tracker)
+
+    def __copy__(self) -> 'MPLEngine':
+        """
+        contexts are immutable, so a copy only needs its own rules, schedule, history and random number generator.  The
+        graph and its index are shared until either engine changes them, and changes to the copy aren't journaled
+        """
+        return self.copy_with_history(copy(self.history))
+
+    def copy_with_history(self, history: History) -> 'MPLEngine':
+        rules = set(self.rule_interpreters)
+        scheduler = copy(self.scheduler)
+        if scheduler.rules is self.rule_interpreters:
+            scheduler.rules = rules
+        self.ontology_index.shared = True
+        return MPLEngine(rules, self.context, history, self.graph, scheduler, self.ontology_index, rng=copy(self.rng))
+
     def __hash__(self):
         context_hash = hash(self.context)
         edges = self.graph.edges(data='relationship')
@@ -172,6 +417,26 @@ class MPLEngine:
         return f'MPLEngine({self.context}, {self.rule_interpreters}, {self.history})'
 
 
+# the engine each exploration process runs its trajectories from
+exploration_engine: Optional[MPLEngine] = None
+
+
+def start_exploration(engine: MPLEngine):
+    global exploration_engine
+    exploration_engine = engine
+
+
+def explore_trajectories(seeds: range, ticks: int, engine: Optional[MPLEngine] = None) \
+        -> Dict[exploration_outcome, int]:
+    engine = engine or exploration_engine
+    tracker = defaultdict(lambda: 0)
+    for trial_seed in seeds:
+        trial = engine.fork(trial_seed)
+        trial.tick(ticks)
+        tracker[frozenset(trial.active.items())] += 1
+    return dict(tracker)
+
+
 def get_trigger_nullifiers(engine: MPLEngine) -> FrozenSet[RuleInterpretation]:
     from mpl.interpreter.expression_evaluation.interpreters.scenario_expression_interpreter import ScenarioResult
     from mpl.interpreter.expression_evaluation.entity_value import false_value
@@ -0,0 +1,111 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Set, FrozenSet, Iterable, Collection, Optional
+
+from mpl.Parser.ExpressionParsers.reference_expression_parser import Reference
+from mpl.interpreter.expression_evaluation.engine_context import EngineContext, context_diff
+from mpl.interpreter.rule_evaluation import RuleInterpreter, RuleInterpretation, RuleInterpretationState
+
+# references that depend on the whole context, changes to the root are never reported in a diff
+global_reference_names = frozenset({'ROOT', '*', 'ROOT.*'})
+
+
+def get_dependency_names(interpreter: RuleInterpreter) -> FrozenSet[str]:
+    """
+    the names of the context entries that can change the interpretation of a rule.  The void of a reference
+    is derived from the entity of that reference, so a rule that reads `A.*` also depends on `A`
+    """
+    result = set()
+    for ref in interpreter.references:
+        result.add(ref.name)
+        if ref.is_void and ref.name != '*':
+            result.add(ref.name[:-2])
+    return frozenset(result)
+
+
+@dataclass
+class RuleScheduler:
+    """
+    Tracks which rule interpreters could produce a different interpretation on the next tick.
+
+    A rule only has to be interpreted again when one of the references it reads has changed, or when its last
+    interpretation was still applicable.
+    """
+    index: Dict[str, Set[RuleInterpreter]] = field(default_factory=lambda: defaultdict(set))
+    unindexed: Set[RuleInterpreter] = field(default_factory=set)
+    pending: Set[RuleInterpreter] = field(default_factory=set)
+    known: Set[RuleInterpreter] = field(default_factory=set)
+    rules: Optional[Collection[RuleInterpreter]] = None
+    rule_count: int = 0
+    context: Optional[EngineContext] = None
+
+    def sync(self, rules: Collection[RuleInterpreter], context: EngineContext):
+        """
+        makes sure the schedule describes the provided rules and context.  Rules or contexts that were swapped out
+        without going through the scheduler cause everything to be interpreted again
+        """
+        self.sync_rules(rules)
+        if context is not self.context:
+            self.pending = set(self.known)
+            self.context = context
+
+    def sync_rules(self, rules: Collection[RuleInterpreter]):
+        if rules is not self.rules or len(rules) != self.rule_count:
+            self.rebuild(rules)
+
+    def rebuild(self, rules: Collection[RuleInterpreter]):
+        self.index = defaultdict(set)
+        self.unindexed = set()
+        self.known = set()
+        self.add(rules, rules)
+        self.pending = set(self.known)
+
+    def add(self, interpreters: Iterable[RuleInterpreter], rules: Collection[RuleInterpreter]):
+        for interpreter in interpreters:
+            names = get_dependency_names(interpreter)
+            if not names or names & global_reference_names:
+                self.unindexed.add(interpreter)
+            for name in names:
+                self.index[name].add(interpreter)
+            self.known.add(interpreter)
+            self.pending.add(interpreter)
+        self.rules = rules
+        self.rule_count = len(rules)
+
+    def remove(self, interpreters: Iterable[RuleInterpreter], rules: Collection[RuleInterpreter]):
+        for interpreter in interpreters:
+            for name in get_dependency_names(interpreter):
+                dependents = self.index.get(name)
+                if dependents is not None:
+                    dependents.discard(interpreter)
+            self.unindexed.discard(interpreter)
+            self.known.discard(interpreter)
+            self.pending.discard(interpreter)
+        self.rules = rules
+        self.rule_count = len(rules)
+
+    def changed(self, changes: context_diff):
+        for key in changes:
+            name = key.name if isinstance(key, Reference) else str(key)
+            dependents = self.index.get(name)
+            if dependents:
+                self.pending |= dependents
+
+    def record(self, interpretations: Dict[RuleInterpreter, RuleInterpretation]):
+        """
+        applicable rules stay scheduled, everything else waits for one of its references to change
+        """
+        self.pending.difference_update(interpretations)
+        for interpreter, interpretation in interpretations.items():
+            if interpretation.state == RuleInterpretationState.APPLICABLE and interpreter in self.known:
+                self.pending.add(interpreter)
+
+    @property
+    def due(self) -> FrozenSet[RuleInterpreter]:
+        return frozenset(self.pending | self.unindexed)
+
+    def __copy__(self) -> 'RuleScheduler':
+        index = defaultdict(set, {name: set(dependents) for name, dependents in self.index.items()})
+        return RuleScheduler(
+            index, set(self.unindexed), set(self.pending), set(self.known), self.rules, self.rule_count, self.context
+        )
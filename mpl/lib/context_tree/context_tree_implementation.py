@@ -10,26 +10,48 @@ from mpl.Parser.ExpressionParsers.reference_expression_parser import Reference,
 
 from mpl.interpreter.expression_evaluation.entity_value import EntityValue, false_value, ev_fv, true_value
 
+# changing any of these fields invalidates the values a node caches about its subtree
+node_content_fields = frozenset({'ref', 'value', 'children'})
+
 
 @dataclasses.dataclass(order=True)
 class ContextTreeNode:
     ref: Reference = Reference('ROOT')
     value: EntityValue = EntityValue()
     children: Dict[str, 'ContextTreeNode'] = dataclasses.field(default_factory=dict)
+    # the tree that is allowed to modify this node in place, nodes owned by nobody else are shared between trees
+    owner: Optional[object] = dataclasses.field(default=None, compare=False, repr=False)
+    _entity: Optional[EntityValue] = dataclasses.field(default=None, init=False, compare=False, repr=False)
+    _hash: Optional[int] = dataclasses.field(default=None, init=False, compare=False, repr=False)
+
+    def __setattr__(self, key, value):
+        object.__setattr__(self, key, value)
+        if key in node_content_fields:
+            self.invalidate()
+
+    def invalidate(self):
+        """
+        clears the cached entity and hash of this node.  Changes to a child have to invalidate every ancestor, which
+        happens on the way down through `editable_child` and `set_child`
+        """
+        object.__setattr__(self, '_entity', None)
+        object.__setattr__(self, '_hash', None)
 
     def __getitem__(self, item: Reference) -> EntityValue:
         return get_value(self, item)
 
     @property
     def void_value(self) -> EntityValue:
-        return EntityValue.from_value(True) if not self.entity else EntityValue()
+        return true_value if not self.entity else false_value
 
     @property
     def entity(self) -> EntityValue:
-        result = self.value
-        for child in self.children.values():
-            result |= child.entity
-        return result
+        if self._entity is None:
+            result = self.value
+            for child in self.children.values():
+                result |= child.entity
+            self._entity = result
+        return self._entity
 
     def to_string(self, indent=0):
         self_str = '+' * indent + f'{self}'
@@ -62,25 +84,52 @@ class ContextTreeNode:
         return True
 
     def __hash__(self):
-        return hash((self.ref, self.value, self.entity, tuple(self.children.items())))
+        if self._hash is None:
+            self._hash = hash((self.ref, self.value, self.entity, tuple(self.children.items())))
+        return self._hash
 
 
 @dataclasses.dataclass(order=True)
 class ContextTree:
+    """
+    ContextTrees are persistent: a copy shares every node with the original, and a change copies only the nodes on
+    the path from the root to the changed node
+    """
     root: ContextTreeNode = dataclasses.field(default_factory=ContextTreeNode)
     _keys: Optional[FrozenSet[Reference]] = None
+    owner: object = dataclasses.field(default_factory=object, compare=False, repr=False)
+    # the indexes are never modified in place, they are rebuilt when the shape or the types of the tree change,
+    # which lets copies of a tree share them
+    _index: Optional[Dict[str, Tuple[str, ...]]] = dataclasses.field(default=None, compare=False, repr=False)
+    _types: Optional[Dict[str, FrozenSet[Reference]]] = dataclasses.field(default=None, compare=False, repr=False)
 
     # region Modifiers
 
     # these are the only methods that should be used to modify the tree
 
+    def editable_root(self) -> ContextTreeNode:
+        if self.root.owner is not self.owner:
+            self.root = copy_node(self.root, self.owner)
+        return self.root
+
     def clear(self, ref: Reference | FrozenSet[Reference]) -> Dict[Reference, EntityValue]:
-        return clear_references(self.root, ref)
+        known = all(self.get_node(x) is not None for x in ref)
+        changes = clear_references(self.editable_root(), ref, self.owner)
+        if not known:
+            self.reindex()
+        return changes
 
     def change(self, ref: Reference | str, value: EntityValue, update_types=False) -> Dict[Reference, EntityValue]:
         if isinstance(ref, str):
             ref = Reference(ref)
-        return change_node(self.root, ref, value, update_types)
+        # changing a reference that isn't in the tree creates the nodes that lead to it
+        node = self.get_node(ref)
+        changes = change_node(self.editable_root(), ref, value, update_types, self.owner)
+        if node is None:
+            self.reindex()
+        elif update_types and not ref.types <= node.ref.types:
+            self.retype()
+        return changes
 
     def update(self, other: Dict[Reference, EntityValue], update_types=False) -> Dict[Reference, EntityValue]:
         result = dict()
@@ -95,19 +144,74 @@ class ContextTree:
         return result
 
     def add(self, ref: Reference, value: EntityValue):
-        add_child(self.root, ref, value)
-        self._keys = None
+        add_child(self.editable_root(), ref, value, self.owner)
+        self.reindex()
 
     #endregion
 
+    # region Indexes
+
+    def reindex(self):
+        self._index = None
+        self.retype()
+
+    def retype(self):
+        self._keys = None
+        self._types = None
+
+    @property
+    def index(self) -> Dict[str, Tuple[str, ...]]:
+        """
+        the path of child keys that leads from the root to the node for each reference name
+        """
+        if self._index is None:
+            self._index = index_tree(self.root)
+        return self._index
+
+    def find(self, name: str) -> Optional[ContextTreeNode]:
+        path = self.index.get(name)
+        if path is None:
+            return None
+        node = self.root
+        for key in path:
+            node = node.children[key]
+        return node
+
+    def get_node(self, ref: Reference) -> Optional[ContextTreeNode]:
+        """
+        an index backed equivalent of get_node_by_ref
+        """
+        if ref.is_void:
+            parent = self.find(void_parent_name(ref))
+            if parent is None:
+                return None
+            return ContextTreeNode(ref, parent.void_value)
+        node = self.find(ref.name)
+        if node is None or not refs_are_compatible(ref, node.ref):
+            return None
+        return node
+
+    def refs_of_type(self, type_name: str) -> FrozenSet[Reference]:
+        if self._types is None:
+            types = {}
+            for name in self.index:
+                ref = self.find(name).ref
+                for item in ref.types:
+                    types.setdefault(item, set()).add(ref)
+            self._types = {k: frozenset(v) for k, v in types.items()}
+        return self._types.get(type_name, frozenset())
+
+    # endregion
+
     def __hash__(self):
         return hash(self.root)
 
     def __contains__(self, item: Reference):
-        for ref in self.__keys__():
-            if refs_are_compatible(ref, item):
-                return True
-        return False
+        if item.is_void:
+            parent = self.find(void_parent_name(item))
+            return parent is not None and refs_are_compatible(parent.ref.void, item)
+        node = self.find(item.name)
+        return node is not None and refs_are_compatible(node.ref, item)
 
     def __keys__(self) -> FrozenSet[Reference]:
         if self._keys is None:
@@ -118,7 +222,10 @@ class ContextTree:
         yield from self.root.__iter__()
 
     def __getitem__(self, item: Reference) -> EntityValue | Symbol:
-        return get_value(self.root, item)
+        node = self.get_node(item)
+        if node is None:
+            return EntityValue()
+        return node.entity
 
     def to_dict(self):
         return tree_to_dict(self.root)
@@ -133,8 +240,9 @@ class ContextTree:
         return self.root.entity
 
     def __copy__(self):
-        root = copy_tree(self.root)
-        return ContextTree(root, self._keys)
+        # from here on the nodes are shared, so neither tree is allowed to modify them in place
+        self.owner = object()
+        return ContextTree(self.root, self._keys, _index=self._index, _types=self._types)
 
     def to_string(self):
         return self.root.to_string()
@@ -186,7 +294,35 @@ def get_intermediate_child_ref(parent: Reference, ref: Reference, stages: int) -
     return result_expr.reference
 
 
-def add_child(node: ContextTreeNode, ref: Reference, value: EntityValue) -> OperationResult:
+def copy_node(node: ContextTreeNode, owner: Optional[object]) -> ContextTreeNode:
+    result = ContextTreeNode(node.ref, node.value, dict(node.children), owner)
+    result._entity = node._entity
+    result._hash = node._hash
+    return result
+
+
+def set_child(node: ContextTreeNode, child: ContextTreeNode):
+    node.children[child.ref.name] = child
+    node.invalidate()
+
+
+def editable_child(node: ContextTreeNode, name: str, owner: Optional[object]) -> ContextTreeNode:
+    """
+    returns a child of node that can be modified in place, copying it first if it belongs to another tree.
+    Without an owner, nodes are always modified in place
+    """
+    # the child is about to change, so whatever node has cached about it is stale
+    node.invalidate()
+    child = node.children[name]
+    if owner is None or child.owner is owner:
+        return child
+    child = copy_node(child, owner)
+    node.children[name] = child
+    return child
+
+
+def add_child(node: ContextTreeNode, ref: Reference, value: EntityValue, owner: Optional[object] = None) \
+        -> OperationResult:
     if ref.is_void:
         return OperationResult.FAILURE
     relationship = reference_is_child_of_reference(ref, node.ref)
@@ -197,23 +333,24 @@ def add_child(node: ContextTreeNode, ref: Reference, value: EntityValue) -> Oper
             node.ref = dataclasses.replace(node.ref, types=ref.types | node.ref.types)
             return OperationResult.SUCCESS
         case 1 if ref.name not in node.children:
-            new_node = ContextTreeNode(ref, value)
-            node.children[ref.name] = new_node
+            new_node = ContextTreeNode(ref, value, owner=owner)
+            set_child(node, new_node)
             return OperationResult.SUCCESS
         case 1 if ref.name in node.children:
-            existing_node = node.children[ref.name]
-            change_node(existing_node, ref, value)
+            existing_node = editable_child(node, ref.name, owner)
+            change_node(existing_node, ref, value, owner=owner)
             new_types = existing_node.ref.types | ref.types
             existing_node.ref = dataclasses.replace(existing_node.ref, types=new_types)
-            node.children[ref.name] = existing_node
+            set_child(node, existing_node)
             return OperationResult.SUCCESS
         case x if x > 1:
             intermediate_child_ref = get_intermediate_child_ref(node.ref, ref, 1)
-            intermediate_child = node.children.get(intermediate_child_ref.name)
-            if intermediate_child is None:
-                add_child(node, intermediate_child_ref, EntityValue())
-                intermediate_child = node.children[intermediate_child_ref.name]
-            return add_child(intermediate_child, ref, value)
+            if intermediate_child_ref.name not in node.children:
+                add_child(node, intermediate_child_ref, EntityValue(), owner)
+            intermediate_child = editable_child(node, intermediate_child_ref.name, owner)
+            result = add_child(intermediate_child, ref, value, owner)
+            node.invalidate()
+            return result
 
 
 def refs_are_compatible(ref1: Reference, ref2: Reference) -> bool:
@@ -231,6 +368,27 @@ def get_value(node: ContextTreeNode, ref: Reference) -> EntityValue:
     return node.entity
 
 
+def void_parent_name(ref: Reference) -> str:
+    if ref.name == '*':
+        return 'ROOT'
+    return ref.name[:-2]
+
+
+def index_tree(root: ContextTreeNode) -> Dict[str, Tuple[str, ...]]:
+    result = {}
+    pending = [(root, ())]
+    while pending:
+        node, path = pending.pop()
+        # names are unique, unless a change with incompatible types nested a node under its namesake, and a walk
+        # from the root finds the outermost one
+        if node.ref.name in result and len(result[node.ref.name]) <= len(path):
+            continue
+        result[node.ref.name] = path
+        for key, child in node.children.items():
+            pending.append((child, path + (key,)))
+    return result
+
+
 def get_node_by_ref(node: ContextTreeNode, ref: Reference) -> Optional[ContextTreeNode]:
     if refs_are_compatible(ref, node.ref):
         return node
@@ -274,17 +432,21 @@ def get_children_entity(node: ContextTreeNode) -> EntityValue:
     return result
 
 
-def void_children(node: ContextTreeNode) -> Dict[Reference, EntityValue]:
+def void_children(node: ContextTreeNode, owner: Optional[object] = None) -> Dict[Reference, EntityValue]:
     results = {}
-    for child in node.children.values():
-        results |= void_node(child)
+    for name, child in list(node.children.items()):
+        if not child.entity.value:
+            # nothing to clear, so there is no reason to copy this branch
+            continue
+        child = editable_child(node, name, owner)
+        results |= void_node(child, owner)
     return results
 
 
-def void_node(node: ContextTreeNode) -> Dict[Reference, EntityValue]:
+def void_node(node: ContextTreeNode, owner: Optional[object] = None) -> Dict[Reference, EntityValue]:
     result = {}
     original_entity = node.entity
-    result |= void_children(node)
+    result |= void_children(node, owner)
     node.value = false_value
     if node.entity != original_entity:
         result[node.ref] = node.entity
@@ -293,15 +455,17 @@ def void_node(node: ContextTreeNode) -> Dict[Reference, EntityValue]:
     return result
 
 
-def change_child_node(node: ContextTreeNode, ref: Reference, value: EntityValue, update_types=False) -> Dict[Reference, EntityValue]:
+def change_child_node(node: ContextTreeNode, ref: Reference, value: EntityValue, update_types=False,
+                      owner: Optional[object] = None) -> Dict[Reference, EntityValue]:
     result = {}
     intermediate_child_ref = get_intermediate_child_ref(node.ref, ref, 1)
-    intermediate_child = node.children.get(intermediate_child_ref.name)
     original_value = node.entity
-    if intermediate_child is None:
-        intermediate_child = ContextTreeNode(intermediate_child_ref)
-        node.children[intermediate_child_ref.name] = intermediate_child
-    result |= change_node(intermediate_child, ref, value, update_types)
+    if intermediate_child_ref.name in node.children:
+        intermediate_child = editable_child(node, intermediate_child_ref.name, owner)
+    else:
+        intermediate_child = ContextTreeNode(intermediate_child_ref, owner=owner)
+        set_child(node, intermediate_child)
+    result |= change_node(intermediate_child, ref, value, update_types, owner)
     child_value = get_children_entity(node)
     node.value = node.value.without(child_value)
     if node.entity != original_value:
@@ -310,7 +474,8 @@ def change_child_node(node: ContextTreeNode, ref: Reference, value: EntityValue,
     return result
 
 
-def change_node(node: ContextTreeNode, ref: Reference, value: EntityValue, update_types=False) -> Dict[Reference, EntityValue]:
+def change_node(node: ContextTreeNode, ref: Reference, value: EntityValue, update_types=False,
+                owner: Optional[object] = None) -> Dict[Reference, EntityValue]:
     value = EntityValue.from_value(value)
     changes = {}
     degree = reference_is_child_of_reference(ref, node.ref)
@@ -337,25 +502,26 @@ def change_node(node: ContextTreeNode, ref: Reference, value: EntityValue, updat
             # you can pitch into the root's void infinitely
             return {}
         case 1 if ref.is_void and value:
-            changes |= void_node(node)
+            changes |= void_node(node, owner)
         case 1 if ref.is_void and not value:
             # consuming the void
             if node.void_value:
-                changes |= change_node(node, ref.parent, true_value)
+                changes |= change_node(node, ref.parent, true_value, owner=owner)
         case 1 if 'state' in node.ref.types and value:
-            changes |= void_children(node)
-            changes |= change_child_node(node, ref, value, update_types)
+            changes |= void_children(node, owner)
+            changes |= change_child_node(node, ref, value, update_types, owner)
         case _:
-            changes |= change_child_node(node, ref, value, update_types)
+            changes |= change_child_node(node, ref, value, update_types, owner)
 
     return changes
 
 
-def clear_references(node: ContextTreeNode, references: FrozenSet[Reference]) -> Dict[Reference, EntityValue]:
+def clear_references(node: ContextTreeNode, references: FrozenSet[Reference], owner: Optional[object] = None) \
+        -> Dict[Reference, EntityValue]:
     changes = {}
     # TODO: figure out what it means to consume a void reference
     for item in references:
-        changes |= change_node(node, item, EntityValue())
+        changes |= change_node(node, item, EntityValue(), owner=owner)
     return changes
 
 
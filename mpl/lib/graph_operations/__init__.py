@@ -56,3 +56,38 @@ def drop_from_graph(node: Any, graph: Graph) -> MultiDiGraph:
     dropped = {(u, v, d) for u, v, d in edge_set if not node & {u, v}}
     result = edge_set_to_graph(dropped)
     return result
+
+
+def merge_into_graph(graph: MultiDiGraph, other: Graph) -> MultiDiGraph:
+    """
+    Adds the edges of another graph that aren't in a graph yet, in place.
+    :param graph: Graph to add to.
+    :param other: Graph to add.
+    :return: The updated graph.
+    """
+    for u, v, d in other.edges(data=True):
+        existing = graph.get_edge_data(u, v, default={})
+        if d not in existing.values():
+            graph.add_edge(u, v, **d)
+    return graph
+
+
+def remove_from_graph(node: Any, graph: MultiDiGraph) -> MultiDiGraph:
+    """
+    Removes nodes from a graph in place, along with the neighbours that are left without edges.
+    :param node: Node or nodes to remove.
+    :param graph: Graph to remove from.
+    :return: The updated graph.
+    """
+    if not isinstance(node, Iterable):
+        node = {node}
+
+    neighbours = set()
+    for item in node:
+        if item not in graph:
+            continue
+        neighbours |= set(graph.predecessors(item)) | set(graph.successors(item))
+        graph.remove_node(item)
+
+    graph.remove_nodes_from([x for x in neighbours if x in graph and not graph.degree(x)])
+    return graph
@@ -47,6 +47,20 @@ class TrackingMetadata:
 class TrackedValue:
     metadata: TrackingMetadata
 
+    def __reduce__(self):
+        # tracked subclasses are generated at runtime, so they are rebuilt from the value they wrap
+        base_type = type(self).__bases__[0]
+        if is_dataclass(self):
+            params = {k: v for k, v in vars(self).items() if k != 'metadata'}
+            value = base_type(**params)
+        else:
+            value = base_type(self)
+        return track_value, (value, self.metadata)
+
+
+def track_value(value: Any, metadata: TrackingMetadata) -> TrackedValue:
+    return generate_subclass_with_attributes(value, 'Tracked', TrackedValue, {'metadata': metadata})
+
 
 class TrackParser(Generic[Input, Output], Parser[Input, Input]):
     tag: Any
@@ -79,12 +93,7 @@ class TrackParser(Generic[Input, Output], Parser[Input, Input]):
                 tag_value,
             )
 
-            result = generate_subclass_with_attributes(
-                status.value,
-                'Tracked',
-                TrackedValue,
-                {'metadata': metadata}
-            )
+            result = track_value(status.value, metadata)
 
             return Continue(status.remainder, result)
         return status
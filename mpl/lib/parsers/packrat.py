@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Generic, Dict, Tuple, Optional, Any, Sequence, Iterator
+
+from parsita import Parser, Reader, lit
+from parsita.state import Input, Output, Status
+
+"""
+Packrat parsing: inside a `packrat()` block, the parsers wrapped with `memo` remember what they returned at each
+position of a source, so alternatives that start the same way (`longest` tries every one of them) only parse the shared
+part once.  The memo is dropped when the block ends, outside of one the wrapped parsers just run their parser.
+
+Some parsers start over on a fresh source for every line, so the memo keeps a table for each of the last `sources`
+sources it saw
+"""
+
+
+class PackratMemo:
+    def __init__(self, sources: int):
+        self.sources = sources
+        self.tables: OrderedDict[int, Tuple[Sequence, Dict[Tuple[Parser, int], Status]]] = OrderedDict()
+        self.last_source = None
+        self.last_table = None
+
+    def table(self, source: Sequence) -> Dict[Tuple[Parser, int], Status]:
+        if source is self.last_source:
+            return self.last_table
+        key = id(source)
+        entry = self.tables.get(key)
+        if entry is None:
+            # the table holds on to its source, so its id can't be reused while the table is kept
+            entry = (source, {})
+            self.tables[key] = entry
+            if len(self.tables) > self.sources:
+                self.tables.popitem(last=False)
+        else:
+            self.tables.move_to_end(key)
+        self.last_source, self.last_table = entry
+        return self.last_table
+
+
+active_memo: Optional[PackratMemo] = None
+
+
+@contextmanager
+def packrat(sources: int = 8) -> Iterator[PackratMemo]:
+    global active_memo
+    previous = active_memo
+    active_memo = PackratMemo(sources)
+    try:
+        yield active_memo
+    finally:
+        active_memo = previous
+
+
+def copy_status(status: Status) -> Status:
+    # callers merge their errors into the status they get back, so each of them gets its own copy
+    result = object.__new__(type(status))
+    result.__dict__.update(status.__dict__)
+    return result
+
+
+class MemoParser(Generic[Input, Output], Parser[Input, Output]):
+    def __init__(self, parser: Parser[Input, Output]):
+        super().__init__()
+        self.parser = parser
+
+    def consume(self, reader: Reader[Input]):
+        memo = active_memo
+        if memo is None:
+            return self.parser.consume(reader)
+
+        table = memo.table(reader.source)
+        key = (self, reader.position)
+        status = table.get(key)
+        if status is None:
+            status = self.parser.consume(reader)
+            table[key] = status
+        return copy_status(status)
+
+    def __repr__(self):
+        return self.name_or_nothing() + f'memo({self.parser.name_or_repr()})'
+
+
+def memo(parser: Parser[Input, Output] | Any) -> MemoParser:
+    """Remembers the results of the provided parser while inside a `packrat()` block
+
+    The parser must only depend on the source and the position it is given, which holds for every parsita parser
+
+    Args:
+        :param parser: Parser or literal
+    """
+    if isinstance(parser, str):
+        parser = lit(parser)
+    return MemoParser(parser)
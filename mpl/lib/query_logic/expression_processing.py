@@ -3,14 +3,15 @@
 # those symbols are either references to other EntityValues, or plain symbols
 # if an expression has only symbols that refer to plain symbols, then it is simplified
 # an entity value is simplified when all of its symbols refer to plain symbols
-from typing import FrozenSet, Set
+from typing import FrozenSet, Set, Optional
 
-from sympy import Expr, Symbol, symbols
+from sympy import Expr, Symbol, symbols, sympify, S
 from sympy.core.relational import Relational
+from sympy.logic.boolalg import BooleanAtom
 
 from mpl.Parser.ExpressionParsers.reference_expression_parser import Reference
 from mpl.interpreter.expression_evaluation.engine_context import EngineContext
-from mpl.interpreter.expression_evaluation.entity_value import EntityValue, ev_fv
+from mpl.interpreter.expression_evaluation.entity_value import EntityValue, ev_fv, is_plain_number
 
 
 def expr_set_is_simplified(exprs: FrozenSet[Expr], context: EngineContext) -> bool:
@@ -54,7 +55,35 @@ def subs_expr_symbol_with_multiple_values(expr: Expr, symbol: Symbol, values: En
     return frozenset(result)
 
 
+def simplify_symbol(symbol: Symbol, context: EngineContext) -> Optional[FrozenSet[Expr]]:
+    """
+    the simplification of a lone symbol whose value only holds numbers, which is what most references in a query
+    look like.  Returns None when the symbol needs the general substitution
+    """
+    ref = Reference.decode(symbol)
+    value = context[ref]
+    value_refs = value.references
+    value = value.value - value_refs
+    if not all(is_plain_number(x) or isinstance(x, BooleanAtom) for x in value):
+        return None
+
+    result = {ref} | value_refs
+    if value:
+        # substituting a value for the symbol sympifies it
+        result |= {sympify(x) for x in value}
+    elif symbol in context.symbols:
+        result.add(symbol)
+    else:
+        result.add(S.Zero)
+    return frozenset(result)
+
+
 def simplify_single_expression(expr: Expr | Relational, context: EngineContext) -> FrozenSet[Expr]:
+    if isinstance(expr, Symbol) and '`' not in str(expr):
+        simplified = simplify_symbol(expr, context)
+        if simplified is not None:
+            return simplified
+
     result = set()
     working_set = {expr}
     while working_set:
@@ -69,7 +98,7 @@ def simplify_single_expression(expr: Expr | Relational, context: EngineContext)
             result |= value_refs
             value = value.value - value_refs
 
-            if symbol in context.symbols and not value:
+            if not value and symbol in context.symbols:
                 # if it's a symbol that is marked as symbol in context, and it has no value,
                 # then it can be left alone
                 continue
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from symtable import Symbol
 from typing import FrozenSet, Optional
 
@@ -52,12 +53,29 @@ def get_free_symbols_from_relational_set(rel: FrozenSet[Relational]) -> FrozenSe
     return frozenset(result)
 
 
+# the same sets of relationals come up tick after tick, so their reductions are kept
+relational_cache_size = 4096
+
+
 def simplify_relational_set(inequalities: FrozenSet[Relational]) -> FrozenSet[Relational] | bool:
     if not inequalities:
         return frozenset()
+    return cached_simplify_relational_set(frozenset(inequalities))
+
+
+@lru_cache(maxsize=relational_cache_size)
+def cached_simplify_relational_set(inequalities: FrozenSet[Relational]) -> FrozenSet[Relational] | bool:
     free_symbols = get_free_symbols_from_relational_set(inequalities)
     first_symbol = sorted(free_symbols, key=str)[0]
     return ineq_resolver(inequalities, first_symbol)
 
 
+def relational_cache_info():
+    """
+    hits, misses, maxsize and currsize of the cache behind simplify_relational_set
+    """
+    return cached_simplify_relational_set.cache_info()
+
 
+def clear_relational_cache():
+    cached_simplify_relational_set.cache_clear()
@@ -21,8 +21,15 @@ Command	Effect
 +{name}	activates the named reference
 +{name} = {value}	activates the named reference with the provided value
 explore {n}	conducts an exploration of n iterations and prints the distribution of outcomes
+explore {n} {t}	conducts an exploration of n iterations of t ticks each
 ?	prints the current engine context
 ?{name}	prints the state of the named reference
+save binary to {path}	saves a snapshot of the engine that loads without parsing
+load binary from {path}	replaces the engine with a saved snapshot
+stats	prints the time spent in each phase of the profiled ticks, and in the slowest rules
+stats on	starts profiling the ticks of the engine
+stats off	stops profiling the ticks of the engine
+stats to {path}	saves the profiled stats as json
 quit	exits the environment
 help	shows the list of commands
 """
@@ -44,8 +51,11 @@ class MemoryType(IntFlag):
 class LoadCommand:
     path: str
     type: MemoryType = MemoryType.ALL
+    binary: bool = False
 
     def load(self) -> MPLEngine:
+        if self.binary:
+            return MPLEngine.from_snapshot(self.path)
         return MPLEngine.from_file(self.path)
 
     @staticmethod
@@ -58,6 +68,8 @@ class LoadCommand:
                 mt = MemoryType.RULES
             case ['context']:
                 mt = MemoryType.CONTEXT
+            case ['binary']:
+                return LoadCommand(remaining_path, mt, True)
 
         return LoadCommand(remaining_path, mt)
 
@@ -66,8 +78,13 @@ class LoadCommand:
 class SaveCommand:
     path: str
     type: MemoryType = MemoryType.ALL
+    binary: bool = False
 
     def save(self, engine: MPLEngine) -> None:
+        if self.binary:
+            engine.save_snapshot(self.path)
+            return
+
         match self.type:
             case MemoryType.CONTEXT:
                 content = str(engine.context)
@@ -89,6 +106,8 @@ class SaveCommand:
                 mt = MemoryType.RULES
             case ['context']:
                 mt = MemoryType.CONTEXT
+            case ['binary']:
+                return SaveCommand(remaining_path, mt, True)
 
         return SaveCommand(remaining_path, mt)
 
@@ -106,11 +125,38 @@ class TickCommand:
 @dataclass(frozen=True, order=True)
 class ExploreCommand:
     number: int = 1
+    ticks: int = 1
 
     @staticmethod
-    def interpret(text=[]):
+    def interpret(text=[], ticks=[]):
         count = 1 if not text else text[0]
-        return ExploreCommand(int(count))
+        ticks = 1 if not ticks else ticks[0]
+        return ExploreCommand(int(count), int(ticks))
+
+
+class StatsAction(Enum):
+    SHOW = auto()
+    START = auto()
+    STOP = auto()
+    SAVE = auto()
+
+
+@dataclass(frozen=True, order=True)
+class StatsCommand:
+    action: StatsAction = StatsAction.SHOW
+    path: Optional[str] = None
+
+    @staticmethod
+    def interpret(text=[]):
+        match text:
+            case ['on']:
+                return StatsCommand(StatsAction.START)
+            case ['off']:
+                return StatsCommand(StatsAction.STOP)
+            case [[leading_slash, path_components]]:
+                path = ('/' if leading_slash else '') + '/'.join(path_components)
+                return StatsCommand(StatsAction.SAVE, path)
+        return StatsCommand()
 
 
 @dataclass(frozen=True, order=True)
@@ -185,14 +231,15 @@ class ActivateCommand:
 
 class CommandParsers(TextParsers):
     filepath = opt('/') & repsep(reg(r'[^/]+'), '/', min=1)
-    load = lit('load') >> opt((lit('rules') | 'context') << 'from') & filepath > splat(LoadCommand.interpret)
-    save = lit('save') >> opt((lit('rules') | 'context') << 'to') & filepath > splat(SaveCommand.interpret)
+    load = lit('load') >> opt((lit('rules') | 'context' | 'binary') << 'from') & filepath > splat(LoadCommand.interpret)
+    save = lit('save') >> opt((lit('rules') | 'context' | 'binary') << 'to') & filepath > splat(SaveCommand.interpret)
 
     tick = reg(r'\.') >> opt(reg(r'-?\d+')) > TickCommand.interpret
     activate = '+' >> RefExP.expression > ActivateCommand.interpret
     deactivate = '-' >> RefExP.expression > ActivateCommand.deactivate
 
-    explore = 'explore' >> opt(reg(r'\d+')) > ExploreCommand.interpret
+    explore = 'explore' >> opt(reg(r'\d+')) & opt(reg(r'\d+')) > splat(ExploreCommand.interpret)
+    stats = 'stats' >> opt(lit('on') | 'off' | 'to' >> filepath) > StatsCommand.interpret
     query = '?' >> opt(RefExP.expression) > QueryCommand.interpret
     add_rule = 'add' >> RuleExpressionParsers.expression > AddRuleCommand
     drop_rule = 'drop' >> RuleExpressionParsers.expression > DropRuleCommand
@@ -204,4 +251,4 @@ class CommandParsers(TextParsers):
 
     system = quit | help | list | clear
 
-    command = longest(system, tick, activate, deactivate, explore, add_rule, query, load, save, RuleExpressionParsers.expression)
+    command = longest(system, tick, activate, deactivate, explore, stats, add_rule, query, load, save, RuleExpressionParsers.expression)
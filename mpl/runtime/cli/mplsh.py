@@ -12,6 +12,7 @@ from prompt_toolkit.completion import NestedCompleter
 from prompt_toolkit.validation import Validator
 from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
 
+from mpl.Parser.ExpressionParsers.machine_expression_parser import MachineFile
 from mpl.Parser.ExpressionParsers.reference_expression_parser import Reference
 from mpl.Parser.ExpressionParsers.rule_expression_parser import RuleExpression
 from mpl.interpreter.expression_evaluation.engine_context import EngineContext
@@ -21,7 +22,8 @@ from mpl.interpreter.rule_evaluation import RuleInterpreter
 from mpl.interpreter.rule_evaluation.mpl_engine import MPLEngine
 from mpl.interpreter.expression_evaluation.entity_value import EntityValue
 from mpl.runtime.cli.command_parser import CommandParsers, SystemCommand, TickCommand, ExploreCommand, QueryCommand, \
-    ActivateCommand, LoadCommand, AddRuleCommand, ClearCommand, MemoryType, DropRuleCommand, SaveCommand
+    ActivateCommand, LoadCommand, AddRuleCommand, ClearCommand, MemoryType, DropRuleCommand, SaveCommand, StatsCommand, \
+    StatsAction
 
 
 def is_valid_command(text):
@@ -63,8 +65,16 @@ def get_help() -> str:
     .{n}                increments the state of the engine n times then prints the active references
     +{name}             activates the named reference
     -{name}             deactivates the named reference
+    explore {n}         runs n trials of one tick and prints the distribution of outcomes
+    explore {n} {t}     runs n trials of t ticks and prints the distribution of outcomes
     ?                   prints the current engine context
     ?{name}             prints the state of the named reference
+    save binary to {p}  saves a snapshot of the engine that loads without parsing
+    load binary from {p} replaces the engine with a saved snapshot
+    stats               prints the time spent in each phase of the profiled ticks, and in the slowest rules
+    stats on            starts profiling the ticks of the engine
+    stats off           stops profiling the ticks of the engine
+    stats to {p}        saves the profiled stats as json
     quit                exits the environment
     help                shows the list of commands
     """
@@ -134,8 +144,7 @@ def execute_command(engine: MPLEngine, command: str) -> MPLEngine | str | System
             return expressions
         case RuleExpression():
             interpreter = RuleInterpreter.from_expression(value)
-            context = EngineContext.from_references(interpreter.references)
-            engine.context = context | engine.context
+            engine.merge_context(EngineContext.from_references(interpreter.references), replace=False)
             result = engine.execute_interpreters({interpreter})
             return result
         case AddRuleCommand():
@@ -144,29 +153,38 @@ def execute_command(engine: MPLEngine, command: str) -> MPLEngine | str | System
         case DropRuleCommand():
             engine.remove(value.expression)
             return f'Dropped Rule: {value.expression}'
+        case LoadCommand(binary=True):
+            return value.load()
         case LoadCommand(path, MemoryType.CONTEXT):
-            new_context, _ = process_machine_file(path)
-            engine.context |= new_context
-            return engine
+            new_context, _ = process_machine_file(MachineFile.from_file(path))
+            return engine.merge_context(new_context)
         case LoadCommand(path, MemoryType.RULES):
             new_engine = MPLEngine.from_file(path)
-            engine.graph = new_engine.graph
-            engine.rule_interpreters |= new_engine.rule_interpreters
-            return engine
+            return engine.replace_rules(engine.rule_interpreters | new_engine.rule_interpreters, new_engine.graph)
         case LoadCommand(path, MemoryType.ALL):
             new_engine = MPLEngine.from_file(path)
-            engine.graph = new_engine.graph
-            engine.rule_interpreters |= new_engine.rule_interpreters
-            engine.context |= new_engine.context
-            return engine
+            engine.merge_context(new_engine.context)
+            return engine.replace_rules(engine.rule_interpreters | new_engine.rule_interpreters, new_engine.graph)
         case SaveCommand():
             value.save(engine)
         case TickCommand():
             result = engine.tick(value.number)
             return result
         case ExploreCommand() as explore_command:
-            # TODO: explore command
-            return 'NOT IMPLEMENTED'
+            return engine.explore(explore_command.number, explore_command.ticks)
+        case StatsCommand(StatsAction.START):
+            engine.start_profiling()
+            return 'Profiling ticks'
+        case StatsCommand(StatsAction.STOP):
+            engine.stop_profiling()
+            return 'Stopped profiling ticks'
+        case StatsCommand() if engine.profiler is None:
+            return 'Ticks are not being profiled, start with: stats on'
+        case StatsCommand(StatsAction.SAVE, path):
+            engine.profiler.save(path)
+            return f'Saved stats to {path}'
+        case StatsCommand():
+            return engine.profiler.report()
         case QueryCommand() as query_command:
             match query_command.reference:
                 case Reference():
@@ -179,20 +197,20 @@ def execute_command(engine: MPLEngine, command: str) -> MPLEngine | str | System
             match value.memory_type:
                 case MemoryType.CONTEXT:
                     contexts = [EngineContext.from_interpreter(x) for x in engine.rule_interpreters]
-                    engine.context = reduce(EngineContext.__or__, contexts)
-                    return engine
+                    return engine.replace_context(reduce(EngineContext.__or__, contexts))
                 case MemoryType.RULES:
-                    new_engine = MPLEngine()
-                    new_engine.context = engine.context
+                    new_engine = MPLEngine(context=engine.context, journal=engine.journal)
+                    new_engine.checkpoint_journal()
                     return new_engine
                 case MemoryType.ALL:
-                    return MPLEngine()
+                    new_engine = MPLEngine(journal=engine.journal)
+                    new_engine.checkpoint_journal()
+                    return new_engine
 
         case ActivateCommand() as activate_command:
             re = RuleExpression((activate_command.expression,), tuple())
             interpreter = RuleInterpreter.from_expression(re)
-            rule_context = EngineContext.from_interpreter(interpreter)
-            engine.context = rule_context | engine.context
+            engine.merge_context(EngineContext.from_interpreter(interpreter), replace=False)
             results = engine.execute_interpreters(frozenset({interpreter}))
             return results
         case _:
@@ -213,6 +231,11 @@ def run_interactive_session():
         'help': None,
         'quit': None,
         'explore': None,
+        'stats': {
+            'on',
+            'off',
+            'to',
+        },
     }
 
     prompt_kwargs = {